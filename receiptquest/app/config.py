@@ -1,34 +1,94 @@
 from __future__ import annotations
 
-from typing import Dict, Tuple
+from typing import Dict, Iterator, Set, Tuple
 import os
 import json
+import asyncio
+import functools
 import pathlib
+import re
 import secrets
 import hashlib
 import hmac
 import logging
 
+try:
+    import orjson  # type: ignore
+except ImportError:
+    orjson = None  # type: ignore
+
+try:
+    from argon2.low_level import Type as _Argon2Type, hash_secret_raw as _argon2_hash_raw  # type: ignore
+except ImportError:
+    _argon2_hash_raw = None  # type: ignore
+
 logger = logging.getLogger(__name__)
 
+# Candidate env files already scanned in this process; later non-override calls are no-ops
+_ENV_LOADED: Set[str] = set()
+
+# Computed once with abspath (no symlink walk); the module location does not change at runtime
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# One KEY=VALUE line with an optional `export` prefix; a value fully wrapped in matching quotes
+# is unquoted. Blank and comment lines never match because a key cannot start with '#'.
+# Whitespace classes exclude '\n' so a match never spans lines when scanning a whole file.
+_ENV_RE = re.compile(
+    r"""^[ \t]*(?:(?i:export)[ \t]+)?([A-Za-z_][A-Za-z0-9_]*)[ \t]*=[ \t]*"""
+    r"""(?:"([^"\n]*)"|'([^'\n]*)'|(.*?))[ \t\r]*$""",
+    re.MULTILINE,
+)
+
+
+def _iter_env_pairs(text: str) -> Iterator[Tuple[str, str]]:
+    # Scan the whole file in one regex pass instead of splitting it into per-line strings
+    for m in _ENV_RE.finditer(text):
+        key, double_q, single_q, bare = m.groups()
+        if double_q is not None:
+            yield key, double_q
+        elif single_q is not None:
+            yield key, single_q
+        else:
+            yield key, bare or ""
+
+
+def _compute_system_env_paths() -> Tuple[str, ...]:
+    if os.name == "nt":
+        paths = []
+        program_data = os.getenv("ProgramData", "")
+        appdata = os.getenv("APPDATA", "")
+        if program_data:
+            paths.append(os.path.join(program_data, "receiptquest", "env"))
+        if appdata:
+            paths.append(os.path.join(appdata, "receiptquest", "env"))
+        return tuple(paths)
+    return ("/etc/receiptquest/env",)
+
 
-def _parse_env_line(line: str) -> Tuple[str, str] | None:
+# OS-level env file locations; these depend only on OS-provided variables, so resolve them once
+_SYSTEM_ENV_PATHS: Tuple[str, ...] = _compute_system_env_paths()
+
+
+def _iter_env_candidates() -> Iterator[str]:
+    # Explicit path wins
+    explicit = os.getenv("RQS_ENV_PATH")
+    if isinstance(explicit, str) and explicit.strip():
+        yield explicit.strip()
+
+    # Project root and CWD .env files
+    yield os.path.join(_REPO_ROOT, ".env")  # .../ReceiptQuestSystem
+    yield os.path.join(_REPO_ROOT, ".env.local")
+    # CWD can change between calls, so it is looked up here rather than cached
     try:
-        raw = line.strip()
-        if not raw or raw.startswith("#"):
-            return None
-        if raw.lower().startswith("export "):
-            raw = raw[7:].lstrip()
-        if "=" not in raw:
-            return None
-        key, value = raw.split("=", 1)
-        key = key.strip()
-        value = value.strip()
-        if (value.startswith('"') and value.endswith('"')) or (value.startswith("'") and value.endswith("'")):
-            value = value[1:-1]
-        return key, value
-    except Exception:
-        return None
+        cwd = os.getcwd()
+    except OSError:
+        cwd = None
+    if cwd is not None:
+        yield os.path.join(cwd, ".env")
+        yield os.path.join(cwd, ".env.local")
+
+    # OS-specific conventional locations
+    yield from _SYSTEM_ENV_PATHS
 
 
 def load_env_from_files(override: bool = False) -> None:
@@ -36,59 +96,40 @@ def load_env_from_files(override: bool = False) -> None:
 
     - Does not override existing vars unless override=True
     - Supports simple KEY=VALUE and export KEY=VALUE lines, with optional quotes
+    - Only scans the filesystem once per process unless override=True
     """
-    try:
-        candidates = []
-        # Explicit path wins
-        explicit = os.getenv("RQS_ENV_PATH")
-        if isinstance(explicit, str) and explicit.strip():
-            candidates.append(explicit.strip())
-
-        # Project root and CWD .env files
+    if not override and _ENV_LOADED:
+        return
+    env = os.environ
+    seen: Set[str] = set()
+    loaded_any = False
+    for path in _iter_env_candidates():
+        abs_path = os.path.abspath(path)
+        if abs_path in seen:
+            continue
+        seen.add(abs_path)
+        # Only I/O can fail here; parsing below never raises. Never fail app startup on a bad file.
         try:
-            here = pathlib.Path(__file__).resolve()
-            repo_root = here.parent.parent.parent  # .../ReceiptQuestSystem
-            candidates.extend([
-                str(repo_root / ".env"),
-                str(repo_root / ".env.local"),
-                str(pathlib.Path.cwd() / ".env"),
-                str(pathlib.Path.cwd() / ".env.local"),
-            ])
-        except Exception:
-            pass
-
-        # OS-specific conventional locations
-        if os.name == "nt":
-            program_data = os.getenv("ProgramData", "")
-            appdata = os.getenv("APPDATA", "")
-            if program_data:
-                candidates.append(os.path.join(program_data, "receiptquest", "env"))
-            if appdata:
-                candidates.append(os.path.join(appdata, "receiptquest", "env"))
-        else:
-            candidates.append("/etc/receiptquest/env")
+            with open(abs_path, "rb") as fh:
+                blob = fh.read()
+        except FileNotFoundError:
+            continue
+        except OSError as e:
+            logger.debug(f"Failed to load env file {path}: {e}")
+            continue
+        text = blob.decode("utf-8", "replace")
+        if "\x00" in text:
+            # Not a text env file (e.g. UTF-16); os.environ rejects NUL bytes
+            logger.debug(f"Skipping env file with NUL bytes: {path}")
+            continue
+        for key, value in _iter_env_pairs(text):
+            if override or not env.get(key):
+                env[key] = value
+                loaded_any = True
+        if loaded_any:
+            logger.info(f"Loaded environment from: {path}")
+    _ENV_LOADED.update(seen)
 
-        loaded_any = False
-        for path in candidates:
-            try:
-                if not path or not os.path.exists(path):
-                    continue
-                with open(path, "r", encoding="utf-8") as fh:
-                    for line in fh:
-                        parsed = _parse_env_line(line)
-                        if not parsed:
-                            continue
-                        key, value = parsed
-                        if override or not (isinstance(os.getenv(key), str) and os.getenv(key) is not None and os.getenv(key) != ""):
-                            os.environ[key] = value
-                            loaded_any = True
-                if loaded_any:
-                    logger.info(f"Loaded environment from: {path}")
-            except Exception as e:
-                logger.debug(f"Failed to load env file {path}: {e}")
-    except Exception:
-        # Never fail app startup due to dotenv parsing
-        pass
 
 def _expand_user(path: str) -> str:
     try:
@@ -98,13 +139,22 @@ def _expand_user(path: str) -> str:
 
 
 def get_config_path() -> str:
-    env_path = os.getenv("RQS_CONFIG_PATH")
+    """Return the config file path, resolved once per distinct set of path-related env vars."""
+    return _resolve_config_path(
+        os.environ.get("RQS_CONFIG_PATH"),
+        os.environ.get("XDG_CONFIG_HOME"),
+        os.environ.get("ProgramData"),
+    )
+
+
+@functools.lru_cache(maxsize=4)
+def _resolve_config_path(env_path: str | None, xdg: str | None, program_data: str | None) -> str:
     if isinstance(env_path, str) and env_path.strip():
         return _expand_user(env_path.strip())
     # Prefer per-user config when running as a regular user; prefer system config only for root/services
     try:
         if os.name != "nt":
-            user_base = _expand_user(os.getenv("XDG_CONFIG_HOME", "~/.config").strip() or "~/.config")
+            user_base = _expand_user((xdg or "~/.config").strip() or "~/.config")
             user_cfg = os.path.join(user_base, "receiptquest", "config.json")
             sys_cfg = "/etc/receiptquest/config.json"
             # Detect root
@@ -125,10 +175,8 @@ def get_config_path() -> str:
             return user_cfg
         else:
             # Windows: prefer user AppData config; fall back to ProgramData if present
-            xdg = os.getenv("XDG_CONFIG_HOME")
             base = _expand_user(xdg.strip()) if isinstance(xdg, str) and xdg.strip() else _expand_user("~/.config")
             user_cfg = os.path.join(base, "receiptquest", "config.json")
-            program_data = os.getenv("ProgramData")
             pd_cfg = os.path.join(program_data, "receiptquest", "config.json") if isinstance(program_data, str) and program_data.strip() else None
             if os.path.exists(user_cfg) and os.access(user_cfg, os.R_OK):
                 return user_cfg
@@ -137,27 +185,65 @@ def get_config_path() -> str:
             return user_cfg
     except Exception:
         pass
-    xdg = os.getenv("XDG_CONFIG_HOME")
     base = _expand_user(xdg.strip()) if isinstance(xdg, str) and xdg.strip() else _expand_user("~/.config")
     return os.path.join(base, "receiptquest", "config.json")
 
 
-def _read_json_file(path: str) -> Dict[str, str]:
+# Drop cached resolutions, e.g. after creating or removing a config file out of band
+get_config_path.cache_clear = _resolve_config_path.cache_clear  # type: ignore[attr-defined]
+
+
+def _json_loads(raw: bytes):
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def _json_dumps(data: Dict[str, str]) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    return json.dumps(data, indent=2).encode("utf-8")
+
+
+@functools.lru_cache(maxsize=8)
+def _parse_json_file(path: str, mtime_ns: int, size: int) -> Dict[str, str]:
+    # Keyed on (mtime, size) so a rewritten file is parsed again; callers must not mutate the result
     try:
-        with open(path, "r", encoding="utf-8") as fh:
-            data = json.load(fh)
-            if isinstance(data, dict):
-                return {
-                    str(k): str(v) if v is not None else ""
-                    for k, v in data.items()
-                    if isinstance(k, str)
-                }
+        with open(path, "rb") as fh:
+            data = _json_loads(fh.read())
+        if isinstance(data, dict):
+            return {
+                str(k): str(v) if v is not None else ""
+                for k, v in data.items()
+                if isinstance(k, str)
+            }
     except Exception:
         pass
     return {}
 
 
-def _write_json_file(path: str, data: Dict[str, str]) -> None:
+def _read_json_file(path: str) -> Dict[str, str]:
+    """Return a copy of the parsed config at path, or {} if missing/invalid.
+
+    Warm reads cost a single stat: the file is only reopened and parsed when its
+    mtime or size changes. The file is deliberately not kept mapped/open between
+    reads so os.replace() in _write_json_file keeps working on Windows.
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return {}
+    return dict(_parse_json_file(path, st.st_mtime_ns, st.st_size))
+
+
+def _write_json_file(path: str, data: Dict[str, str], durable: bool = True) -> None:
+    """Atomically replace path with data.
+
+    durable=True fsyncs before the rename; credential writes need that. Callers
+    persisting non-critical state can pass durable=False and rely on os.replace
+    atomicity alone. The payload is serialized up front and written with raw
+    os.write calls; new files are created owner-only (0600) since they hold hashes.
+    """
     directory = os.path.dirname(path)
     try:
         pathlib.Path(directory).mkdir(parents=True, exist_ok=True)
@@ -165,10 +251,16 @@ def _write_json_file(path: str, data: Dict[str, str]) -> None:
         pass
     tmp_path = path + ".tmp"
     try:
-        with open(tmp_path, "w", encoding="utf-8") as fh:
-            json.dump(data, fh, indent=2)
-            fh.flush()
-            os.fsync(fh.fileno())
+        payload = memoryview(_json_dumps(data))
+        flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0)
+        fd = os.open(tmp_path, flags, 0o600)
+        try:
+            while payload:
+                payload = payload[os.write(fd, payload):]
+            if durable:
+                os.fsync(fd)
+        finally:
+            os.close(fd)
         os.replace(tmp_path, path)
     except Exception:
         # Clean up temporary file if it exists
@@ -183,57 +275,229 @@ def generate_secret_key() -> str:
     return secrets.token_hex(32)
 
 
-def _hash_password(password: str, salt_hex: str | None = None, iterations: int = 200_000) -> Tuple[str, str, int]:
+# New credentials use Argon2id when argon2-cffi is installed, scrypt otherwise; "pbkdf2"
+# remains supported for hashes saved by older releases. RQS_KDF records which one produced
+# RQS_WEB_HASH; a missing tag means pbkdf2. For scrypt, RQS_PBKDF2_ITERATIONS holds the
+# CPU/memory cost N, for argon2id the time cost (memory is fixed at the OWASP 46 MiB profile).
+DEFAULT_KDF = "argon2id" if _argon2_hash_raw is not None else "scrypt"
+LEGACY_KDF = "pbkdf2"
+_PBKDF2_DEFAULT_ITERATIONS = 200_000
+_SCRYPT_DEFAULT_N = 2 ** 14
+_SCRYPT_R = 8
+_SCRYPT_P = 1
+_ARGON2_DEFAULT_TIME_COST = 3
+_ARGON2_MEMORY_KIB = 46 * 1024
+_ARGON2_PARALLELISM = 1
+_DEFAULT_COST = {"argon2id": _ARGON2_DEFAULT_TIME_COST, "scrypt": _SCRYPT_DEFAULT_N}
+
+# OpenSSL's PBKDF2 already reuses the keyed HMAC ipad/opad states across iterations. Builds
+# without OpenSSL fall back to a pure-Python loop, which makes legacy logins far slower.
+if getattr(hashlib.pbkdf2_hmac, "__module__", "") == "hashlib":
+    logger.warning("hashlib.pbkdf2_hmac is not OpenSSL-backed; legacy PBKDF2 logins will be slow")
+
+
+def _hash_password_bytes(password: str, salt: bytes, cost: int, kdf: str = DEFAULT_KDF) -> bytes:
+    secret = password.encode("utf-8")
+    if kdf == "argon2id":
+        if _argon2_hash_raw is None:
+            raise ValueError("argon2id hashes need the argon2-cffi package")
+        return _argon2_hash_raw(
+            secret,
+            salt,
+            time_cost=cost,
+            memory_cost=_ARGON2_MEMORY_KIB,
+            parallelism=_ARGON2_PARALLELISM,
+            hash_len=32,
+            type=_Argon2Type.ID,
+        )
+    if kdf == "scrypt":
+        # maxmem must cover 128 * r * N or OpenSSL rejects larger N values
+        maxmem = 128 * _SCRYPT_R * cost + (1 << 20)
+        return hashlib.scrypt(secret, salt=salt, n=cost, r=_SCRYPT_R, p=_SCRYPT_P, maxmem=maxmem, dklen=32)
+    if kdf == "pbkdf2":
+        return hashlib.pbkdf2_hmac("sha256", secret, salt, cost)
+    raise ValueError(f"unsupported kdf: {kdf}")
+
+
+def _cost_is_sane(kdf: str, cost: int) -> bool:
+    # Prevent DoS via excessive work factors read from config
+    if kdf == "argon2id":
+        if _argon2_hash_raw is None:
+            logger.warning(
+                "Stored password hash uses argon2id but argon2-cffi is not importable; "
+                "logins will fail until it is reinstalled (pip install argon2-cffi)"
+            )
+            return False
+        return 1 <= cost <= 10
+    if kdf == "scrypt":
+        return 2 ** 10 <= cost <= 2 ** 17 and (cost & (cost - 1)) == 0
+    if kdf == "pbkdf2":
+        return 1000 <= cost <= 10_000_000
+    return False
+
+
+def _hash_password(
+    password: str,
+    salt_hex: str | None = None,
+    iterations: int | None = None,
+    kdf: str = DEFAULT_KDF,
+) -> Tuple[str, str, int]:
     if not isinstance(password, str):
         raise ValueError("password must be a string")
     if salt_hex is None or not isinstance(salt_hex, str) or not salt_hex:
         salt = secrets.token_bytes(16)
     else:
         salt = bytes.fromhex(salt_hex)
-    dk = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, iterations)
+    if iterations is None:
+        iterations = _DEFAULT_COST.get(kdf, _PBKDF2_DEFAULT_ITERATIONS)
+    dk = _hash_password_bytes(password, salt, iterations, kdf)
     return salt.hex(), dk.hex(), iterations
 
 
-def verify_password(password: str, salt_hex: str, hash_hex: str, iterations: int = 200_000) -> bool:
-    # Prevent DoS via excessive iterations
-    if iterations < 1000 or iterations > 10_000_000:
+def needs_rehash(kdf: str) -> bool:
+    """True when a stored hash was made with an older KDF than DEFAULT_KDF."""
+    return (kdf or LEGACY_KDF).strip().lower() != DEFAULT_KDF
+
+
+def default_cost(kdf: str) -> int:
+    """Cost used for ``kdf`` when RQS_PBKDF2_ITERATIONS is missing or invalid."""
+    return _DEFAULT_COST.get((kdf or LEGACY_KDF).strip().lower(), _PBKDF2_DEFAULT_ITERATIONS)
+
+
+@functools.lru_cache(maxsize=8)
+def _decode_stored_hash(salt_hex: str, hash_hex: str) -> Tuple[bytes, bytes]:
+    # Stored credentials are hex only at the config boundary; decode each pair once
+    return bytes.fromhex(salt_hex), bytes.fromhex(hash_hex)
+
+
+def verify_password(
+    password: str,
+    salt_hex: str,
+    hash_hex: str,
+    iterations: int = _PBKDF2_DEFAULT_ITERATIONS,
+    kdf: str = LEGACY_KDF,
+) -> bool:
+    kdf = (kdf or LEGACY_KDF).strip().lower()
+    if not _cost_is_sane(kdf, iterations):
         return False
     try:
-        salt = bytes.fromhex(salt_hex)
-        expected = bytes.fromhex(hash_hex)
-    except Exception:
+        salt, expected = _decode_stored_hash(salt_hex, hash_hex)
+    except (TypeError, ValueError):
         return False
-    test = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, int(iterations))
+    test = _hash_password_bytes(password, salt, int(iterations), kdf)
     return hmac.compare_digest(test, expected)
+
+
+async def verify_password_async(
+    password: str,
+    salt_hex: str,
+    hash_hex: str,
+    iterations: int = _PBKDF2_DEFAULT_ITERATIONS,
+    kdf: str = LEGACY_KDF,
+) -> bool:
+    """Run verify_password in the default executor so the KDF does not block an event loop.
+
+    hashlib releases the GIL while deriving, so other coroutines keep running.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, verify_password, password, salt_hex, hash_hex, iterations, kdf)
+
+
+# Environment variables that feed load_config(); part of its cache key
+_CONFIG_ENV_KEYS = (
+    "RQS_WEB_USER",
+    "RQS_WEB_HASH",
+    "RQS_WEB_SALT",
+    "RQS_WEB_PASS",
+    "RQS_PBKDF2_ITERATIONS",
+    "RQS_KDF",
+    "RQS_SECRET_KEY",
+)
+
+
+# When all of these are set the environment is authoritative and the config file is skipped
+_ENV_AUTHORITATIVE_KEYS = ("RQS_WEB_USER", "RQS_WEB_HASH", "RQS_WEB_SALT", "RQS_SECRET_KEY")
+
+
 def load_config() -> Tuple[Dict[str, str], bool]:
     """Return (config, needs_setup).
 
     Priority: environment variables override file values. If no creds are set,
     needs_setup will be True.
+
+    Results are cached per (config path, file mtime and size, relevant env vars), so
+    repeat calls only cost a stat until the file or environment changes.
+
+    When RQS_WEB_USER, RQS_WEB_HASH, RQS_WEB_SALT and RQS_SECRET_KEY are all set in
+    the environment (containers, systemd EnvironmentFile), the config file is not
+    read at all; RQS_PBKDF2_ITERATIONS and RQS_KDF then also come only from the env.
+
+    Raises RuntimeError when a plaintext RQS_WEB_PASS in a writable config file cannot be
+    migrated to a hash.
     """
     # Load .env and system env files first so RQS_CONFIG_PATH and creds are available
     try:
         load_env_from_files(override=False)
     except Exception:
         pass
+    env_cfg = _config_from_env_only()
+    if env_cfg is not None:
+        return env_cfg, False
     path = get_config_path()
+    try:
+        st = os.stat(path)
+        mtime_ns, size = st.st_mtime_ns, st.st_size
+    except OSError:
+        mtime_ns, size = 0, -1
+    env_key = tuple(os.environ.get(k) for k in _CONFIG_ENV_KEYS)
+    cfg, needs_setup = _load_config_cached(path, mtime_ns, size, env_key)
+    cfg = dict(cfg)
+    # The plaintext migration may rewrite the file, so it runs outside the cache
+    if needs_setup and _migrate_plaintext_password(path, cfg):
+        needs_setup = not (cfg.get("RQS_WEB_USER") and cfg.get("RQS_WEB_HASH") and cfg.get("RQS_WEB_SALT"))
+    return cfg, needs_setup
+
+
+def _config_from_env_only() -> Dict[str, str] | None:
+    env = os.environ
+    values = {k: (env.get(k) or "").strip() for k in _ENV_AUTHORITATIVE_KEYS}
+    if not all(values.values()):
+        return None
+    kdf = (env.get("RQS_KDF") or "").strip().lower() or LEGACY_KDF
+    iters = (env.get("RQS_PBKDF2_ITERATIONS") or "").strip()
+    try:
+        if int(iters) <= 0:
+            iters = str(default_cost(kdf))
+    except ValueError:
+        iters = str(default_cost(kdf))
+    values["RQS_PBKDF2_ITERATIONS"] = iters
+    values["RQS_KDF"] = kdf
+    return values
+
+
+@functools.lru_cache(maxsize=4)
+def _load_config_cached(
+    path: str, mtime_ns: int, size: int, env_key: Tuple[str | None, ...]
+) -> Tuple[Dict[str, str], bool]:
+    # mtime_ns, size and env_key only key the cache; the body reads the file and env
+    # directly and must not write anything
     file_cfg = _read_json_file(path)
 
     cfg: Dict[str, str] = {
         "RQS_WEB_USER": file_cfg.get("RQS_WEB_USER", ""),
         "RQS_WEB_HASH": file_cfg.get("RQS_WEB_HASH", ""),
         "RQS_WEB_SALT": file_cfg.get("RQS_WEB_SALT", ""),
-        "RQS_PBKDF2_ITERATIONS": str(file_cfg.get("RQS_PBKDF2_ITERATIONS", "200000")),
+        "RQS_PBKDF2_ITERATIONS": str(file_cfg.get("RQS_PBKDF2_ITERATIONS", "") or ""),
+        "RQS_KDF": file_cfg.get("RQS_KDF", "") or LEGACY_KDF,
         "RQS_SECRET_KEY": file_cfg.get("RQS_SECRET_KEY", ""),
     }
 
     # Environment overrides (handle credentials as a group to prevent mismatches)
-    # Also read from /etc/receiptquest/env (or platform equivalents)
-    load_env_from_files(override=False)
     env_user = os.getenv("RQS_WEB_USER")
     env_hash = os.getenv("RQS_WEB_HASH")
     env_salt = os.getenv("RQS_WEB_SALT")
     env_iters = os.getenv("RQS_PBKDF2_ITERATIONS")
+    env_kdf = os.getenv("RQS_KDF")
     env_secret = os.getenv("RQS_SECRET_KEY")
     env_pass = os.getenv("RQS_WEB_PASS")
 
@@ -251,6 +515,12 @@ def load_config() -> Tuple[Dict[str, str], bool]:
         cfg["RQS_WEB_SALT"] = env_salt.strip()
         if has_env_user:
             cfg["RQS_WEB_USER"] = env_user.strip()
+        # Env hashes predate the KDF tag, so they are pbkdf2 unless RQS_KDF says otherwise
+        env_kdf_name = env_kdf.strip().lower() if isinstance(env_kdf, str) and env_kdf.strip() else LEGACY_KDF
+        if env_kdf_name != (cfg.get("RQS_KDF") or LEGACY_KDF).strip().lower():
+            # The file's cost belongs to a different KDF; fall back to this one's default
+            cfg["RQS_PBKDF2_ITERATIONS"] = ""
+        cfg["RQS_KDF"] = env_kdf_name
         # iterations override if present and valid
         if isinstance(env_iters, str) and env_iters.strip():
             try:
@@ -267,6 +537,7 @@ def load_config() -> Tuple[Dict[str, str], bool]:
             cfg["RQS_WEB_HASH"] = hash_hex
             cfg["RQS_WEB_SALT"] = salt_hex
             cfg["RQS_PBKDF2_ITERATIONS"] = str(iters)
+            cfg["RQS_KDF"] = DEFAULT_KDF
         except Exception as e:
             logger.error(f"Failed to derive hash from env password: {e}")
     else:
@@ -278,64 +549,92 @@ def load_config() -> Tuple[Dict[str, str], bool]:
     for norm_key in ("RQS_WEB_HASH", "RQS_WEB_SALT", "RQS_PBKDF2_ITERATIONS", "RQS_SECRET_KEY"):
         if isinstance(cfg.get(norm_key), str):
             cfg[norm_key] = cfg[norm_key].strip()
+    cfg["RQS_KDF"] = (cfg.get("RQS_KDF") or LEGACY_KDF).strip().lower()
+    if not cfg.get("RQS_PBKDF2_ITERATIONS"):
+        cfg["RQS_PBKDF2_ITERATIONS"] = str(default_cost(cfg["RQS_KDF"]))
     
-    # Migrate plaintext password to hashed fields (support file or env plaintext)
+    needs_setup = not (cfg.get("RQS_WEB_USER") and cfg.get("RQS_WEB_HASH") and cfg.get("RQS_WEB_SALT"))
+    return cfg, needs_setup
+
+
+@functools.lru_cache(maxsize=2)
+def _derive_plaintext_hash(password: str) -> Tuple[str, str, int]:
+    # A read-only config keeps its plaintext, so the migration reruns on every load; hash once
+    return _hash_password(password)
+
+
+def _migrate_plaintext_password(path: str, cfg: Dict[str, str]) -> bool:
+    """Hash a plaintext RQS_WEB_PASS into cfg in place and persist it when the file allows.
+
+    Returns True when cfg was updated.
+    """
     need_hash = (not cfg.get("RQS_WEB_HASH") or not cfg.get("RQS_WEB_SALT"))
+    if not need_hash:
+        return False
+    file_cfg = _read_json_file(path)
+    env_pass = os.getenv("RQS_WEB_PASS")
+    env_user = os.getenv("RQS_WEB_USER")
     file_pass = file_cfg.get("RQS_WEB_PASS")
     file_user = file_cfg.get("RQS_WEB_USER")
     env_pass_val = env_pass.strip() if (isinstance(env_pass, str) and env_pass.strip()) else None
     env_user_val = env_user.strip() if (isinstance(env_user, str) and env_user.strip()) else None
-    if need_hash and ((file_pass and file_user) or (env_pass_val and env_user_val)):
+    if not ((file_pass and file_user) or (env_pass_val and env_user_val)):
+        return False
+    try:
+        source_pass = file_pass if (file_pass and file_user) else env_pass_val
+        source_user = file_user if (file_pass and file_user) else env_user_val
+        salt_hex, hash_hex, iters = _derive_plaintext_hash(source_pass)
+        # Keep cfg consistent (override any env user to match hashed creds)
+        cfg["RQS_WEB_USER"] = (source_user or "").strip()
+        cfg["RQS_WEB_HASH"] = hash_hex
+        cfg["RQS_WEB_SALT"] = salt_hex
+        cfg["RQS_PBKDF2_ITERATIONS"] = str(iters)
+        cfg["RQS_KDF"] = DEFAULT_KDF
+        # Attempt to persist only if we can write to the chosen config path and the source was file-based
+        write_allowed = False
         try:
-            source_pass = file_pass if (file_pass and file_user) else env_pass_val
-            source_user = file_user if (file_pass and file_user) else env_user_val
-            salt_hex, hash_hex, iters = _hash_password(source_pass)
-            # Keep cfg consistent (override any env user to match hashed creds)
-            cfg["RQS_WEB_USER"] = (source_user or "").strip()
-            cfg["RQS_WEB_HASH"] = hash_hex
-            cfg["RQS_WEB_SALT"] = salt_hex
-            cfg["RQS_PBKDF2_ITERATIONS"] = str(iters)
-            # Attempt to persist only if we can write to the chosen config path and the source was file-based
+            write_allowed = os.access(path, os.W_OK)
+        except Exception:
             write_allowed = False
+        source_is_file = bool(file_pass and file_user)
+        if write_allowed and source_is_file:
+            new = dict(file_cfg)
+            new.pop("RQS_WEB_PASS", None)
+            new["RQS_WEB_USER"] = cfg["RQS_WEB_USER"]
+            new["RQS_WEB_SALT"] = salt_hex
+            new["RQS_WEB_HASH"] = hash_hex
+            new["RQS_PBKDF2_ITERATIONS"] = str(iters)
+            new["RQS_KDF"] = DEFAULT_KDF
+            _write_json_file(path, new)
+            _load_config_cached.cache_clear()
+    except Exception as e:
+        logger.error(f"Failed to migrate plaintext password to hashed format: {e}")
+        # If we cannot write to the config path (likely system-wide), do not fail startup. Credentials are set in-memory.
+        try:
+            can_write = os.access(path, os.W_OK)
+        except Exception:
+            can_write = False
+        if can_write:
+            # Ensure plaintext password is removed from on-disk config even on failure
             try:
-                write_allowed = os.access(path, os.W_OK)
-            except Exception:
-                write_allowed = False
-            source_is_file = bool(file_pass and file_user)
-            if write_allowed and source_is_file:
-                new = dict(file_cfg)
-                new.pop("RQS_WEB_PASS", None)
-                new["RQS_WEB_USER"] = cfg["RQS_WEB_USER"]
-                new["RQS_WEB_SALT"] = salt_hex
-                new["RQS_WEB_HASH"] = hash_hex
-                new["RQS_PBKDF2_ITERATIONS"] = str(iters)
-                _write_json_file(path, new)
-        except Exception as e:
-            logger.error(f"Failed to migrate plaintext password to hashed format: {e}")
-            # If we cannot write to the config path (likely system-wide), do not fail startup. Credentials are set in-memory.
-            try:
-                can_write = os.access(path, os.W_OK)
-            except Exception:
-                can_write = False
-            if can_write:
-                # Ensure plaintext password is removed from on-disk config even on failure
-                try:
-                    safe_config = dict(file_cfg)
-                    safe_config.pop("RQS_WEB_PASS", None)
-                    _write_json_file(path, safe_config)
-                except Exception as write_error:
-                    logger.error(f"Failed to remove plaintext password from config file: {write_error}")
-                    raise RuntimeError(f"Migration failed and unable to secure config file: {write_error}") from e
-                # Re-raise the original migration error
-                raise RuntimeError(f"Password migration failed: {e}") from e
-            else:
-                logger.warning("Running with migrated credentials in memory (read-only config). Consider updating the config file with hashed credentials.")
+                safe_config = dict(file_cfg)
+                safe_config.pop("RQS_WEB_PASS", None)
+                _write_json_file(path, safe_config)
+            except Exception as write_error:
+                logger.error(f"Failed to remove plaintext password from config file: {write_error}")
+                raise RuntimeError(f"Migration failed and unable to secure config file: {write_error}") from e
+            # Re-raise the original migration error
+            raise RuntimeError(f"Password migration failed: {e}") from e
+        else:
+            logger.warning("Running with migrated credentials in memory (read-only config). Consider updating the config file with hashed credentials.")
+    return True
 
-    needs_setup = not (cfg.get("RQS_WEB_USER") and cfg.get("RQS_WEB_HASH") and cfg.get("RQS_WEB_SALT"))
-    return cfg, needs_setup
 
+# Invalidation hook for callers that rewrite the config file
+load_config.cache_clear = _load_config_cached.cache_clear  # type: ignore[attr-defined]
 
-def save_credentials(username: str, password: str, secret_key: str | None = None) -> None:
+def save_credentials(username: str, password: str, secret_key: str | None = None) -> Tuple[str, str, int]:
+    """Hash and store the web login; returns the new (salt_hex, hash_hex, cost) under DEFAULT_KDF."""
     path = get_config_path()
     cfg = _read_json_file(path)
     cfg["RQS_WEB_USER"] = (username or "").strip()
@@ -343,7 +642,10 @@ def save_credentials(username: str, password: str, secret_key: str | None = None
     cfg["RQS_WEB_SALT"] = salt_hex
     cfg["RQS_WEB_HASH"] = hash_hex
     cfg["RQS_PBKDF2_ITERATIONS"] = str(iters)
+    cfg["RQS_KDF"] = DEFAULT_KDF
     if not secret_key:
         secret_key = generate_secret_key()
     cfg["RQS_SECRET_KEY"] = secret_key
-    _write_json_file(path, cfg)
+    _write_json_file(path, cfg, durable=True)
+    load_config.cache_clear()  # type: ignore[attr-defined]
+    return salt_hex, hash_hex, iters
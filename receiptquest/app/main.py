@@ -1,22 +1,162 @@
-from typing import List, Dict
+from typing import Callable, List, Dict, Optional, Sequence, Set, Tuple
 import os
+import re
+import json
+import hashlib
+import functools
 import sys
 import time
 import argparse
 import threading
 import signal
 from pathlib import Path
+from types import SimpleNamespace
 
-from ..printing import select_printer_target, select_printer_target_noninteractive, open_printer_from_target, print_markdown_document
+from ..printing import select_printer_target, select_printer_target_noninteractive, open_printer_from_target, print_markdown_document, Printer
 from ..core.models import Quest, Objective
 from ..printing.quest_formatter import print_supportive_quest
-from .web_server import create_app
+from .config import load_env_from_files, _write_json_file
+from .step_templates import (
+    CAT_CLEANING,
+    CAT_COOKING,
+    CAT_EMAIL,
+    CAT_ERRAND,
+    CAT_HOMEWORK,
+    CAT_LAUNDRY,
+    CAT_MATH,
+    CAT_MINDFUL,
+    CAT_SHOWER,
+    CAT_STUDY,
+    CAT_WORKOUT,
+    CAT_WRITING,
+    GENERIC_STEPS,
+    PRIORITY_ORDER,
+    STEP_TEMPLATES,
+    STUDY_FAMILY,
+    STUDY_STEPS,
+)
 
 try:
     from ..core.quest_generator import LocalLLMQuestGenerator
 except Exception:
     LocalLLMQuestGenerator = None  # type: ignore
 
+try:
+    import ahocorasick  # type: ignore
+except ImportError:
+    ahocorasick = None  # type: ignore
+
+
+# Compound-intent separators ("X then Y", "X; Y"), matched case-insensitively;
+# a literal "|" also splits, as it did when separators were rewritten to "|"
+_COMPOUND_SEP_RE = re.compile(
+    r"\s+and\s+then\s+|\s+then\s+|\s+after\s+that\s+|\s+afterwards\s+|;|\|", re.IGNORECASE
+)
+
+# Objective separators for the no-LLM fallback template
+_FALLBACK_SPLIT_RE = re.compile(r",|\s+and\s+", re.IGNORECASE)
+
+# _auto_markdown_from_text: sentence boundaries and inline list separators
+_SENTENCE_SPLIT_RE = re.compile(r"[.!?]+\s+")
+_LIST_SPLIT_RE = re.compile(r"\s*(?:,|;|\band\b)\s*", re.IGNORECASE)
+_MARKDOWN_PREFIXES = ("# ", "## ", "### ", "- ", "* ", "> ", "```", "1. ")
+
+# Keywords per category bit (see step_templates) used by _expand_to_super_adhd
+# Matched as substrings, not whole words: "cook" covers "cooking", "prep" covers "prepare"
+_CATEGORY_KEYWORDS: Dict[int, List[str]] = {
+    CAT_HOMEWORK: ["homework", "hw", "assignment", "classwork"],
+    CAT_MATH: ["math", "algebra", "geometry", "calculus", "statistics"],
+    CAT_STUDY: ["study", "revise", "review"],
+    CAT_WRITING: ["write", "writing", "essay", "paper", "notes", "journal"],
+    CAT_SHOWER: ["shower", "bathe", "bath", "wash hair"],
+    CAT_CLEANING: [
+        "clean", "tidy", "declutter", "organize", "vacuum", "wipe", "dishes", "kitchen", "desk", "room", "trash"
+    ],
+    CAT_EMAIL: ["email", "inbox", "admin", "paperwork", "forms", "bills", "tax", "bank"],
+    CAT_WORKOUT: ["workout", "exercise", "gym", "walk", "run", "stretch", "pushup", "yoga"],
+    CAT_COOKING: ["cook", "cooking", "meal", "breakfast", "lunch", "dinner", "prep", "food"],
+    CAT_LAUNDRY: ["laundry", "clothes", "wash", "dryer", "fold", "hamper"],
+    CAT_ERRAND: ["grocery", "shopping", "store", "errand", "pharmacy"],
+    CAT_MINDFUL: ["meditate", "breath", "breathing", "mindful", "mindfulness"],
+}
+
+_KEYWORD_BITS: Dict[str, int] = {}
+for _bit, _words in _CATEGORY_KEYWORDS.items():
+    for _word in _words:
+        _KEYWORD_BITS[_word] = _KEYWORD_BITS.get(_word, 0) | _bit
+
+# Fallback scan order: shower, then the study family (its MATH/HOMEWORK variant bits
+# first), then the single-template categories in PRIORITY_ORDER
+_MATCH_ORDER: Tuple[int, ...] = (CAT_SHOWER, CAT_MATH, CAT_HOMEWORK, CAT_STUDY, CAT_WRITING) + PRIORITY_ORDER
+
+# Cheap reject: no keyword can match unless one of these characters occurs
+_CATEGORY_FIRST_CHARS = frozenset(word[0] for word in _KEYWORD_BITS)
+
+if ahocorasick is not None:
+    _KEYWORD_AUTOMATON = ahocorasick.Automaton()
+    for _word, _bits in _KEYWORD_BITS.items():
+        _KEYWORD_AUTOMATON.add_word(_word, _bits)
+    _KEYWORD_AUTOMATON.make_automaton()
+else:
+    _KEYWORD_AUTOMATON = None
+
+
+def _keyword_mask(fields: Tuple[str, ...]) -> int:
+    """Return the category bits found in ``fields`` (any case).
+
+    Only bits that can still change the chosen template are guaranteed: scanning
+    stops early once shower, or a study/single-template category, has matched.
+    """
+    # One lowercase copy; no keyword contains a newline, so matches never span fields
+    context = "\n".join(fields).lower()
+    if _CATEGORY_FIRST_CHARS.isdisjoint(context):
+        return 0
+    mask = 0
+    if _KEYWORD_AUTOMATON is not None:
+        # Single C-level pass; reports overlapping matches, so results equal substring checks
+        for _, bits in _KEYWORD_AUTOMATON.iter(context):
+            mask |= bits
+            if mask & CAT_SHOWER:
+                break
+        return mask
+    # Without the automaton, substring checks are the fastest pure-Python option;
+    # a keyword-alternation regex measured ~2-3x slower here. Categories are tried in
+    # template priority order and the scan stops once the template is decided.
+    for bit in _MATCH_ORDER:
+        for word in _CATEGORY_KEYWORDS[bit]:
+            if word in context:
+                mask |= bit
+                break
+        # MATH alone is not decisive: the study checklist also depends on HOMEWORK
+        if mask and bit != CAT_MATH:
+            return mask
+    return mask
+
+
+def _env_truthy(name: str, default: bool = False) -> bool:
+    v = os.getenv(name)
+    if v is None:
+        return default
+    return v.strip().lower() in {"1", "true", "yes", "on"}
+
+
+@functools.lru_cache(maxsize=1)
+def _startup_config() -> SimpleNamespace:
+    """Environment-driven defaults, read once (after .env files are loaded by run())."""
+    try:
+        web_threads = max(1, int(os.getenv("RQS_WEB_THREADS", "4")))
+    except ValueError:
+        web_threads = 4
+    return SimpleNamespace(
+        mode=os.getenv("RQS_MODE", "markdown"),
+        style=os.getenv("RQS_STYLE", "checkbox"),
+        host=os.getenv("RQS_HOST", "127.0.0.1"),
+        port=int(os.getenv("RQS_PORT", "54873")),
+        adhd_mode=os.getenv("RQS_ADHD_MODE", "regular").lower(),
+        web_threads=web_threads,
+        reload=_env_truthy("RQS_RELOAD", default=sys.stdin.isatty()),
+    )
+
 
 def _prompt_input(prompt: str) -> str:
     try:
@@ -29,23 +169,36 @@ def _parse_objectives(raw: str) -> List[str]:
     return [item.strip() for item in raw.split(',') if item.strip()]
 
 
+_LLM_SINGLETON: Optional["LocalLLMQuestGenerator"] = None
+_LLM_LOCK = threading.Lock()
+
+
+def _get_llm() -> "LocalLLMQuestGenerator":
+    """Return a shared generator, constructing it on first use (thread-safe)."""
+    global _LLM_SINGLETON
+    if _LLM_SINGLETON is None:
+        with _LLM_LOCK:
+            if _LLM_SINGLETON is None:
+                _LLM_SINGLETON = LocalLLMQuestGenerator()
+    return _LLM_SINGLETON
+
+
+def _truncate_title(text: str, limit: int = 80) -> str:
+    return f"{text[:limit - 3]}..." if len(text) > limit else text
+
+
+def _split_intent(text: str) -> Tuple[str, List[str]]:
+    """Return the title snippet for ``text`` and its comma/'and'-separated parts."""
+    title_snippet = _truncate_title(text)
+    # naive objective split on 'and' / commas
+    parts = [p for p in map(str.strip, _FALLBACK_SPLIT_RE.split(text)) if p]
+    return title_snippet, parts or [text]
+
+
 def _fallback_template_from_intent(intent: str) -> Dict[str, object]:
     text = intent.strip()
-    if len(text) > 80:
-        title_snippet = text[:77] + "..."
-    else:
-        title_snippet = text
-    # naive objective split on 'and' / commas
-    parts = []
-    for sep in [",", " and "]:
-        if sep in text.lower():
-            parts = [p.strip() for p in text.replace(" and ", ",").split(",") if p.strip()]
-            break
-    if not parts:
-        parts = [text]
-    objectives = []
-    for p in parts[:5]:
-        objectives.append(p.capitalize())
+    title_snippet, parts = _split_intent(text)
+    objectives = [p.capitalize() for p in parts[:5]]
     if len(objectives) < 2:
         objectives = [
             "Plan the task",
@@ -60,196 +213,135 @@ def _fallback_template_from_intent(intent: str) -> Dict[str, object]:
     }
 
 
-def _expand_to_super_adhd(objectives: List[str], title: str, description: str) -> List[str]:
+def _expand_to_super_adhd(objectives: List[str], title: str, description: str) -> Sequence[str]:
     """Return a very granular, deterministic checklist tailored for ADHD activation.
 
     - Avoids fabricating specific content (books, topics, etc.)
     - Uses only generic process steps; lightly adapts wording based on detected keywords
     - Expands only when the existing objective list is short (<= 3)
+
+    The result is a shared template tuple; callers only iterate it.
     """
-    context = f"{title} \n {description} \n {'; '.join(objectives)}".lower()
-    is_homework = any(k in context for k in ["homework", "hw", "assignment", "classwork"])
-    is_math = any(k in context for k in ["math", "algebra", "geometry", "calculus", "statistics"])
-    is_study = any(k in context for k in ["study", "revise", "review"]) or is_homework
-    is_writing_task = any(k in context for k in ["write", "writing", "essay", "paper", "notes", "journal"]) or is_study
-    is_hygiene_shower = any(k in context for k in ["shower", "bathe", "bath", "wash hair"]) 
-    is_cleaning = any(k in context for k in [
-        "clean", "tidy", "declutter", "organize", "vacuum", "wipe", "dishes", "kitchen", "desk", "room", "trash"
-    ])
-    is_email_admin = any(k in context for k in [
-        "email", "inbox", "admin", "paperwork", "forms", "bills", "tax", "bank"
-    ])
-    is_workout = any(k in context for k in [
-        "workout", "exercise", "gym", "walk", "run", "stretch", "pushup", "yoga"
-    ])
-    is_cooking = any(k in context for k in [
-        "cook", "cooking", "meal", "breakfast", "lunch", "dinner", "prep", "food"
-    ])
-    is_laundry = any(k in context for k in [
-        "laundry", "clothes", "wash", "dryer", "fold", "hamper"
-    ])
-    is_errand = any(k in context for k in [
-        "grocery", "shopping", "store", "errand", "pharmacy"
-    ])
-    is_mindfulness = any(k in context for k in [
-        "meditate", "breath", "breathing", "mindful", "mindfulness"
-    ])
-
-    # Hygiene/Shower template
-    if is_hygiene_shower:
-        shower_steps: List[str] = [
-            "Grab towel and clean clothes",
-            "Put phone away and head to bathroom",
-            "Turn on water, set comfy temperature",
-            "Step in and rinse",
-            "Soap body",
-            "Shampoo hair (if needed)",
-            "Rinse off",
-            "Turn water off",
-            "Towel dry",
-            "Get dressed",
-            "Mark this as done",
-        ]
-        return shower_steps
+    mask = _keyword_mask((title, description, *objectives))
 
-    # Study/Homework/Writing template
-    materials_step = None
-    if is_math:
-        materials_step = "Gather materials (notebook, paper, calculator)"
-    elif is_writing_task or is_study:
-        materials_step = "Gather materials (notebook, paper)"
+    # Templates in priority order; the first matching category wins
+    if mask & CAT_SHOWER:
+        return STEP_TEMPLATES[CAT_SHOWER]
+    if mask & STUDY_FAMILY:
+        return STUDY_STEPS[mask & (CAT_MATH | CAT_HOMEWORK)]
+    for bits in PRIORITY_ORDER:
+        if mask & bits:
+            return STEP_TEMPLATES[bits]
+    return GENERIC_STEPS
 
-    open_task_step = (
-        "Take the homework out and open to the right page" if is_homework else "Open the task and load the next part"
-    )
-    first_unit_step = (
-        "Do the first problem" if (is_math or is_homework) else "Do the first small part"
-    )
-    next_chunk_step = (
-        "Do the next 2–3 problems" if (is_math or is_homework) else "Do the next small chunk"
-    )
 
-    granular: List[str] = []
-    if is_writing_task or is_study or is_math or is_homework:
-        granular.append("Grab a writing utensil")
-        if materials_step:
-            granular.append(materials_step)
-        granular.extend([
-            "Clear a small space and sit down",
-            open_task_step,
-            "Skim the instructions (30 seconds)",
-            first_unit_step,
-            "Take a quick sip of water",
-            next_chunk_step,
-            "Quick check and save your work",
-            "Put materials back in your bag/place",
-            "Mark this as done",
-        ])
-        return granular[:12]
-
-    # Generic task template (no writing utensil)
-    if is_cleaning:
-        return [
-            "Bag up obvious trash",
-            "Gather tools (bin, cloth, spray)",
-            "Clear a small surface",
-            "Sort: keep / relocate / trash",
-            "Wipe the surface",
-            "Return keep items neatly",
-            "Quick sweep or vacuum",
-            "Take trash out",
-            "Take a sip of water",
-            "Mark this as done",
-        ]
+# Removed unused interactive helper _maybe_generate_with_local_llm
 
-    if is_email_admin:
-        return [
-            "Open inbox/admin tab",
-            "Set a 10-minute focus timer",
-            "Archive obvious noise",
-            "Handle one priority item",
-            "Handle one small item",
-            "If stuck: write a 1-sentence plan",
-            "Schedule remaining for later",
-            "Close the tab",
-            "Mark this as done",
-        ]
 
-    if is_workout:
-        return [
-            "Change into comfy clothes",
-            "Fill a water bottle",
-            "Warm up for 1 minute",
-            "Do first easy set",
-            "Rest and sip water",
-            "Do second set",
-            "Stretch briefly",
-            "Log that you moved today",
-            "Mark this as done",
-        ]
+# Per-part study hints passed to the LLM prompt as (category_override, subject)
+_STUDY_PART_WORDS = ("study", "homework", "assignment", "classwork", "math", "english", "essay", "paper", "writing")
+_MATH_PART_WORDS = ("math", "algebra", "geometry", "calculus", "statistics")
+_ENGLISH_PART_WORDS = ("english", "essay", "paper", "writing")
+# One substring alternation per word list, so each check is a single regex scan
+_STUDY_PART_RE = re.compile("|".join(map(re.escape, _STUDY_PART_WORDS)))
+_MATH_PART_RE = re.compile("|".join(map(re.escape, _MATH_PART_WORDS)))
+_ENGLISH_PART_RE = re.compile("|".join(map(re.escape, _ENGLISH_PART_WORDS)))
 
-    if is_cooking:
-        return [
-            "Wash hands",
-            "Gather ingredients and tools",
-            "Clear a small prep space",
-            "Preheat or boil if needed",
-            "Do the first prep step",
-            "Cook the main part",
-            "Plate the food",
-            "Quick wipe of the counter",
-            "Enjoy a bite and mark done",
-        ]
 
-    if is_laundry:
-        return [
-            "Collect clothes into hamper",
-            "Load washer (sort if needed)",
-            "Add detergent and start",
-            "Move to dryer",
-            "Fold 5–10 items",
-            "Put folded items away",
-            "Mark this as done",
-        ]
+def _part_overrides(part: str) -> Tuple[Optional[str], Optional[str]]:
+    part_l = part.lower()
+    if not _STUDY_PART_RE.search(part_l):
+        return None, None
+    if _MATH_PART_RE.search(part_l):
+        return "study", "math"
+    if _ENGLISH_PART_RE.search(part_l):
+        return "study", "english"
+    return "study", None
 
-    if is_errand:
-        return [
-            "Write a tiny list (3 items)",
-            "Grab wallet/keys/bags",
-            "Head out the door",
-            "Get the top 1–2 items first",
-            "Get the remaining items",
-            "Return home and unpack",
-            "Put bags away",
-            "Mark this as done",
-        ]
 
-    if is_mindfulness:
-        return [
-            "Sit comfortably",
-            "Set a 3-minute timer",
-            "Close eyes and breathe",
-            "If distracted: label and return",
-            "Open eyes and stretch",
-            "Mark this as done",
-        ]
+# Opt-in cross-run cache of LLM intent results (RQS_INTENT_CACHE=1)
+_INTENT_CACHE_MAX = 256
+_persisted_intents: Optional[Dict[str, List[str]]] = None
 
-    generic_steps: List[str] = [
-        "Gather what you need",
-        "Clear a small space and sit/stand to start",
-        "Open the task or next part",
-        "Skim goals (30 seconds)",
-        "Do the first small part",
-        "Take a quick sip of water",
-        "Do the next small chunk",
-        "Quick check and save/put aside",
-        "Put things away",
-        "Mark this as done",
-    ]
-    return generic_steps
 
+@functools.lru_cache(maxsize=1)
+def _intent_cache_path() -> str:
+    # Resolved on first use, after run() has loaded .env files that may set XDG_CACHE_HOME
+    return os.path.join(
+        os.getenv("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"),
+        "receiptquest",
+        "intent_cache.json",
+    )
 
-# Removed unused interactive helper _maybe_generate_with_local_llm
+
+def _load_persisted_intents() -> Dict[str, List[str]]:
+    global _persisted_intents
+    if _persisted_intents is None:
+        _persisted_intents = {}
+        try:
+            with open(_intent_cache_path(), "rb") as fh:
+                raw = json.loads(fh.read())
+            if isinstance(raw, dict):
+                _persisted_intents = {
+                    str(k): [str(x) for x in v] for k, v in raw.items() if isinstance(v, list) and len(v) > 1
+                }
+        except (OSError, ValueError):
+            pass
+    return _persisted_intents
+
+
+@functools.lru_cache(maxsize=256)
+def _cached_llm_intent(text: str) -> Tuple[str, Tuple[str, ...]]:
+    """Return (title, objectives) generated for ``text``.
+
+    Failures raise rather than return, so only successful generations are cached.
+    """
+    persisted = None
+    if _env_truthy("RQS_INTENT_CACHE"):
+        persisted = _load_persisted_intents()
+        entry = persisted.get(text)
+        if entry:
+            return entry[0], tuple(entry[1:])
+
+    # Split on compound separators in one pass (no "|"-normalized copy)
+    pieces = _COMPOUND_SEP_RE.split(text)
+    parts = [p.strip(" ,.") for p in pieces if p.strip()] if len(pieces) > 1 else [text]
+
+    generator = _get_llm()
+
+    objectives: List[str] = []
+    titles: List[str] = []
+    # Every break phrase contains "break", so one substring test covers them all
+    wants_break = "break" in text.lower()
+
+    overrides = [_part_overrides(part) for part in parts]
+    results = generator.generate_granular_batch(parts, fast=True, per_part_overrides=overrides)
+
+    for idx, (part, data_g) in enumerate(zip(parts, results)):
+        part_objs = [str(o) for o in (data_g.get("objectives", []) or [])][:9]
+        if not part_objs:
+            data_c = generator.generate(part, fast=True)
+            part_objs = [str(o) for o in (data_c.get("objectives", []) or [])][:7]
+        if idx > 0 and wants_break:
+            objectives.append("Stand up and stretch briefly")
+        objectives.extend(part_objs)
+        t = str(data_g.get("title") or part).strip()
+        if t:
+            titles.append(t)
+    if not objectives:
+        raise ValueError("model returned no objectives")
+
+    final_title = " → ".join(titles[:3]) if len(titles) > 1 else f"Quest: {_truncate_title(text)}"
+    result = (final_title, tuple(objectives[:18]))
+    if persisted is not None:
+        persisted[text] = [final_title, *result[1]]
+        while len(persisted) > _INTENT_CACHE_MAX:
+            persisted.pop(next(iter(persisted)))
+        try:
+            _write_json_file(_intent_cache_path(), persisted, durable=False)
+        except OSError:
+            pass
+    return result
 
 
 def _generate_data_from_intent(intent: str, use_llm: bool) -> Dict[str, object]:
@@ -257,6 +349,7 @@ def _generate_data_from_intent(intent: str, use_llm: bool) -> Dict[str, object]:
     otherwise build a simple fallback template.
 
     This avoids additional interactive prompts to reduce cognitive load.
+    LLM results are memoized per intent text; see _cached_llm_intent.
     """
     text = intent.strip()
     if not text:
@@ -264,58 +357,15 @@ def _generate_data_from_intent(intent: str, use_llm: bool) -> Dict[str, object]:
     if not use_llm or LocalLLMQuestGenerator is None:
         return _fallback_template_from_intent(text)
     try:
-        # Normalize compound separators
-        raw = text
-        separators = [" then ", " and then ", " after that ", " afterwards ", ";"]
-        for sep in separators:
-            # Case-insensitive replacement
-            import re
-            raw = re.sub(re.escape(sep), "|", raw, flags=re.IGNORECASE)
-        parts = [p.strip(" ,.") for p in raw.split("|") if p.strip()] if "|" in raw else [text]
-
-        generator = LocalLLMQuestGenerator()
-
-        objectives: List[str] = []
-        titles: List[str] = []
-        text_lower = text.lower()
-        wants_break = any(k in text_lower for k in [" break", "take a break", "quick break"]) or "break" in text_lower
-
-        for idx, part in enumerate(parts):
-            subj = None
-            part_l = part.lower()
-            cat_override = None
-            if any(w in part_l for w in ["study", "homework", "assignment", "classwork", "math", "english", "essay", "paper", "writing"]):
-                cat_override = "study"
-                if any(w in part_l for w in ["math", "algebra", "geometry", "calculus", "statistics"]):
-                    subj = "math"
-                elif any(w in part_l for w in ["english", "essay", "paper", "writing"]):
-                    subj = "english"
-
-                data_g = generator.generate_granular(part, [], fast=True, category_override=cat_override, subject=subj)
-            else:
-                data_g = generator.generate_granular(part, [], fast=True)
-
-            part_objs = [str(o) for o in (data_g.get("objectives", []) or [])][:9]
-            if not part_objs:
-                data_c = generator.generate(part, fast=True)
-                part_objs = [str(o) for o in (data_c.get("objectives", []) or [])][:7]
-            if idx > 0 and wants_break:
-                objectives.append("Stand up and stretch briefly")
-            objectives.extend(part_objs)
-            t = str(data_g.get("title") or part).strip()
-            if t:
-                titles.append(t)
-
-        final_title = (" → ").join(titles[:3]) if len(titles) > 1 else f"Quest: {text[:77] + '...' if len(text) > 80 else text}"
-        data = {
-            "title": final_title,
-            "description": text,
-            "objectives": objectives[:18] if objectives else _fallback_template_from_intent(text)["objectives"],
-            "rewards": "+10 Momentum, +10 Satisfaction",
-        }
-        return data
+        final_title, objectives = _cached_llm_intent(text)
     except Exception:
         return _fallback_template_from_intent(text)
+    return {
+        "title": final_title,
+        "description": text,
+        "objectives": list(objectives),
+        "rewards": "+10 Momentum, +10 Satisfaction",
+    }
 
 
 def _auto_markdown_from_text(text: str) -> str:
@@ -330,29 +380,26 @@ def _auto_markdown_from_text(text: str) -> str:
     t = (text or "").strip()
     if not t:
         return ""
-    # Looks like Markdown already
-    stripped = t.lstrip()
-    if stripped.startswith(("# ", "## ", "### ", "- ", "* ", "> ", "```", "1. ")) or "\n- " in t or "\n* " in t:
+    # Looks like Markdown already (t is stripped, so no lstrip copy is needed)
+    if t.startswith(_MARKDOWN_PREFIXES) or "\n- " in t or "\n* " in t:
         return t
 
-    lines = [ln.strip() for ln in t.splitlines() if ln.strip()]
+    lines = [s for ln in t.splitlines() if (s := ln.strip())]
     if len(lines) >= 2:
         title = lines[0]
         items = lines[1:]
-        bullets = "\n".join(f"- {it}" for it in items[:20])
+        bullets = "\n".join([f"- {it}" for it in items[:20]])
         return f"# {title}\n\n{bullets}"
 
     # Single-line heuristics
-    import re
     # Identify first sentence as title
-    sentence_parts = re.split(r"[.!?]+\s+", t)
+    sentence_parts = _SENTENCE_SPLIT_RE.split(t)
     sentence_parts = [p.strip(" ,;:-") for p in sentence_parts if p.strip()]
     title = sentence_parts[0] if sentence_parts else t
     remainder = t[len(title):].strip()
 
     # Try to extract list-like items from remainder
-    list_candidates = re.split(r"\s*(?:,|;|\band\b)\s*", remainder, flags=re.IGNORECASE)
-    list_candidates = [c.strip() for c in list_candidates if c.strip()]
+    list_candidates = [s for c in _LIST_SPLIT_RE.split(remainder) if (s := c.strip())]
     items: List[str] = []
     if len(list_candidates) >= 2:
         items = list_candidates
@@ -360,26 +407,101 @@ def _auto_markdown_from_text(text: str) -> str:
         items = sentence_parts[1:]
 
     if items and len(items) >= 2:
-        bullets = "\n".join(f"- {it}" for it in items[:10])
+        bullets = "\n".join([f"- {it}" for it in items[:10]])
         return f"# {title}\n\n{bullets}"
     return f"# {title}"
 
 
+# inotify(7) event bits used by the stdlib reloader
+_IN_MODIFY = 0x00000002
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_ISDIR = 0x40000000
+_INOTIFY_MASK = _IN_MODIFY | _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE
+
+
+def _start_inotify_reloader(root: str, ignored_dirs: Set[str], on_change: Callable[[], None]) -> bool:
+    """Block on an inotify fd in a daemon thread and call on_change for any .py event.
+
+    Linux only, via ctypes so no extra dependency is needed. Returns False when inotify
+    is unavailable so the caller can fall back to polling.
+    """
+    if not sys.platform.startswith("linux"):
+        return False
+    try:
+        import ctypes
+        import select
+        import struct
+
+        libc = ctypes.CDLL(None, use_errno=True)
+        inotify_add_watch = libc.inotify_add_watch
+        fd = libc.inotify_init1(os.O_CLOEXEC)
+    except (OSError, AttributeError):
+        return False
+    if fd < 0:
+        return False
+
+    watches: Dict[int, str] = {}
+
+    def _add_tree(top: str) -> None:
+        # One walk at startup (and per new directory); the kernel reports everything after that
+        for dirpath, dirnames, _ in os.walk(top):
+            dirnames[:] = [d for d in dirnames if d not in ignored_dirs]
+            wd = inotify_add_watch(fd, os.fsencode(dirpath), _INOTIFY_MASK)
+            if wd >= 0:
+                watches[wd] = dirpath
+
+    _add_tree(root)
+    if not watches:
+        os.close(fd)
+        return False
+
+    header = struct.Struct("iIII")
+
+    def _watch() -> None:
+        while True:
+            select.select([fd], [], [])
+            data = os.read(fd, 65536)
+            offset = 0
+            while offset < len(data):
+                wd, mask, _cookie, name_len = header.unpack_from(data, offset)
+                offset += header.size
+                name = data[offset:offset + name_len].rstrip(b"\0")
+                offset += name_len
+                if mask & _IN_ISDIR:
+                    if mask & (_IN_CREATE | _IN_MOVED_TO) and wd in watches:
+                        dirname = os.fsdecode(name)
+                        if dirname not in ignored_dirs:
+                            _add_tree(os.path.join(watches[wd], dirname))
+                elif name.endswith(b".py"):
+                    on_change()
+
+    threading.Thread(target=_watch, daemon=True).start()
+    return True
+
+
 def run():
     """Main entry point for the Receipt Quest System."""
+    # Load .env-like files once, before env-driven defaults are read (web mode reuses this)
+    load_env_from_files(override=False)
+    config = _startup_config()
+
     # CLI args and environment-driven defaults
     parser = argparse.ArgumentParser(description="Receipt Quest System")
     parser.add_argument(
         "--mode",
         choices=["markdown", "quest"],
-        default=os.getenv("RQS_MODE", "markdown"),
+        default=config.mode,
         help=argparse.SUPPRESS,
     )
     # Simplified: make Express · Super ADHD the implicit default; keep style for flexibility
     parser.add_argument(
         "--style",
         choices=["numbered", "checkbox"],
-        default=os.getenv("RQS_STYLE", "checkbox"),
+        default=config.style,
         help=argparse.SUPPRESS,
     )
     # Always ON: local LLM generation
@@ -393,7 +515,7 @@ def run():
     parser.add_argument(
         "--adhd-mode",
         choices=["regular", "super"],
-        default=(os.getenv("RQS_ADHD_MODE", "regular").lower()),
+        default=config.adhd_mode,
         help=argparse.SUPPRESS,
     )
     parser.add_argument(
@@ -428,13 +550,13 @@ def run():
     )
     parser.add_argument(
         "--host",
-        default=os.getenv("RQS_HOST", "127.0.0.1"),
+        default=config.host,
         help=argparse.SUPPRESS,
     )
     parser.add_argument(
         "--port",
         type=int,
-        default=int(os.getenv("RQS_PORT", "54873")),
+        default=config.port,
         help=argparse.SUPPRESS,
     )
     args, _ = parser.parse_known_args()
@@ -446,6 +568,9 @@ def run():
     if args.web:
         # Non-interactive printer target detection for server mode
         try:
+            # Flask is only needed here; keep it off the CLI startup path
+            from .web_server import create_app
+
             target = select_printer_target_noninteractive()
             app = create_app(
                 printer_target=target,
@@ -456,8 +581,10 @@ def run():
             # Prefer waitress; a unified file-watcher (below) handles reloads when enabled
             try:
                 from waitress import serve  # type: ignore
+                # Waitress serves requests from a thread pool; printing/LLM work runs on the
+                # app's own queue worker, so more threads only help concurrent page loads
                 print(f"Starting server on {args.host}:{args.port}")
-                serve(app, host=args.host, port=args.port)
+                serve(app, host=args.host, port=args.port, threads=config.web_threads)
             except ImportError:
                 print(
                     "WARNING: Waitress not installed. "
@@ -479,13 +606,7 @@ def run():
     target = select_printer_target()
 
     # Unified autoreload: enabled when RQS_RELOAD=1 or when running from a git checkout with a TTY
-    def _env_truthy(name: str, default: bool = False) -> bool:
-        v = os.getenv(name)
-        if v is None:
-            return default
-        return v.strip().lower() in {"1", "true", "yes", "on"}
-
-    enable_reload = _env_truthy("RQS_RELOAD", default=sys.stdin.isatty())
+    enable_reload = config.reload
 
     # SIGHUP handler: systemd can reload by sending HUP
     def _handle_sighup(signum, frame):  # type: ignore[no-redef]
@@ -498,190 +619,227 @@ def run():
     except Exception:
         pass
 
-    # Simple autoreloader (standard library only)
+    # Autoreloader: watchdog (inotify/FSEvents/ReadDirectoryChangesW) when installed,
+    # raw inotify on Linux without it, otherwise a standard-library mtime poll
     if enable_reload:
-        def _scan_tree(root: Path) -> Dict[str, float]:
-            mtimes: Dict[str, float] = {}
-            for dirpath, dirnames, filenames in os.walk(str(root)):
-                # Skip noisy/irrelevant directories
-                dirnames[:] = [d for d in dirnames if d not in {
-                    "__pycache__", ".git", ".venv", "venv", ".mypy_cache", ".pytest_cache"
-                }]
-                for fname in filenames:
-                    if not fname.endswith(".py"):
-                        continue
-                    fpath = os.path.join(dirpath, fname)
-                    try:
-                        mtimes[fpath] = os.stat(fpath).st_mtime
-                    except Exception:
-                        pass
-            return mtimes
-
         watch_root = Path(__file__).resolve().parents[1]  # receiptquest/
-        _baseline = _scan_tree(watch_root)
-
-        def _watch_and_restart() -> None:
-            nonlocal _baseline
-            while True:
-                time.sleep(1.0)
-                current = _scan_tree(watch_root)
-                changed = False
-                if current.keys() != _baseline.keys():
-                    changed = True
-                else:
-                    for p, m in current.items():
-                        if _baseline.get(p) != m:
-                            changed = True
-                            break
-                if changed:
-                    print("Detected code changes. Restarting...")
-                    sys.stdout.flush()
-                    os.execv(sys.executable, [sys.executable] + sys.argv)
+        ignored_dirs = {"__pycache__", ".git", ".venv", "venv", ".mypy_cache", ".pytest_cache"}
+
+        def _restart() -> None:
+            print("Detected code changes. Restarting...")
+            sys.stdout.flush()
+            os.execv(sys.executable, [sys.executable] + sys.argv)
+
+        try:
+            from watchdog.observers import Observer  # type: ignore
+            from watchdog.events import PatternMatchingEventHandler  # type: ignore
+        except ImportError:
+            Observer = None  # type: ignore
+
+        if Observer is not None:
+            class _RestartOnChange(PatternMatchingEventHandler):  # type: ignore[misc]
+                def on_any_event(self, event) -> None:  # type: ignore[no-untyped-def]
+                    # Ignore open/close notifications (importing a module opens it)
+                    if event.event_type in {"created", "modified", "deleted", "moved"}:
+                        _restart()
+
+            handler = _RestartOnChange(
+                patterns=["*.py"],
+                ignore_patterns=[f"*/{d}/*" for d in sorted(ignored_dirs)],
+                ignore_directories=True,
+            )
+            observer = Observer()
+            observer.daemon = True
+            observer.schedule(handler, str(watch_root), recursive=True)
+            observer.start()
+        elif not _start_inotify_reloader(str(watch_root), ignored_dirs, _restart):
+            def _tree_fingerprint(root: str) -> int:
+                # Sum of 64-bit (path, mtime_ns) hashes per .py file; no per-tick dict, and
+                # independent of scandir order so a reshuffled listing is not a change
+                total = 0
+                stack = [root]
+                while stack:
+                    try:
+                        entries = os.scandir(stack.pop())
+                    except OSError:
+                        continue
+                    with entries:
+                        for entry in entries:
+                            try:
+                                if entry.is_dir(follow_symlinks=False):
+                                    # Skip noisy/irrelevant directories
+                                    if entry.name not in ignored_dirs:
+                                        stack.append(entry.path)
+                                elif entry.name.endswith(".py"):
+                                    h = hashlib.blake2b(digest_size=8)
+                                    h.update(entry.path.encode("utf-8", "surrogateescape") + b"\0")
+                                    h.update(entry.stat().st_mtime_ns.to_bytes(8, "little"))
+                                    total += int.from_bytes(h.digest(), "little")
+                            except OSError:
+                                pass
+                return total & 0xFFFFFFFFFFFFFFFF
+
+            baseline = _tree_fingerprint(str(watch_root))
+
+            def _watch_and_restart() -> None:
+                while True:
+                    time.sleep(1.0)
+                    if _tree_fingerprint(str(watch_root)) != baseline:
+                        _restart()
+
+            threading.Thread(target=_watch_and_restart, daemon=True).start()
+
+    # Loop-invariant CLI options as locals
+    mode, style, use_llm, adhd_mode, once = args.mode, args.style, args.use_llm, args.adhd_mode, args.once
+    line_arg, task_arg, title_arg, steps_arg, desc_arg = (
+        args.line, args.task, args.title, args.steps, args.description
+    )
 
-        threading.Thread(target=_watch_and_restart, daemon=True).start()
+    printer: Optional[Printer] = None
+    try:
+        while True:
+            print("\n--- Create a New Quest ---")
+
+            non_interactive_input = any([line_arg, task_arg, title_arg, steps_arg, desc_arg])
+
+            if non_interactive_input:
+                if line_arg:
+                    line = line_arg.strip()
+                    if "|" in line:
+                        raw_title, raw_steps = line.split("|", 1)
+                        title = raw_title.strip() or "Untitled Quest"
+                        description = desc_arg.strip() if isinstance(desc_arg, str) else ""
+                        objectives = _parse_objectives(raw_steps)
+                        data = {"title": title, "description": description, "objectives": objectives}
+                    else:
+                        data = _generate_data_from_intent(line, use_llm)
+                        title = str(data.get("title", "Untitled Quest")) or "Untitled Quest"
+                        description = str(data.get("description", ""))
+                        objectives = list(data.get("objectives", []))  # type: ignore[assignment]
+                elif title_arg or steps_arg or desc_arg:
+                    title = (title_arg or "Untitled Quest").strip() or "Untitled Quest"
+                    description = (desc_arg or "").strip()
+                    objectives = _parse_objectives(steps_arg or "")
+                    if not objectives and task_arg:
+                        # fall back to intent generation for steps if steps not provided
+                        data = _generate_data_from_intent(task_arg, use_llm)
+                        objectives = list(data.get("objectives", []))  # type: ignore[assignment]
+                    data = {"title": title, "description": description, "objectives": objectives}
+                elif task_arg:
+                    data = _generate_data_from_intent(task_arg, use_llm)
+                    title = str(data.get("title", "Untitled Quest")) or "Untitled Quest"
+                    description = str(data.get("description", ""))
+                    objectives = list(data.get("objectives", []))  # type: ignore[assignment]
 
-    while True:
-        print("\n--- Create a New Quest ---")
+                next_action = None
+                total_estimate_mins = None
+                step_style = style
+                cue_text = None
+                timer_minutes = None
+
+                # Super ADHD expansion (non-interactive)
+                if adhd_mode == "super":
+                    if LocalLLMQuestGenerator is not None:
+                        try:
+                            generator = _get_llm()
+                            data_g = generator.generate_granular(title or description or "", objectives, fast=True)
+                            gen_objs = list(data_g.get("objectives", []) or [])  # type: ignore[assignment]
+                            if gen_objs:
+                                objectives = [str(o) for o in gen_objs]
+                                title = str(data_g.get("title", title) or title)
+                                description = str(data_g.get("description", description) or description)
+                            else:
+                                # Fallback to coarse generation if granular empty
+                                data = generator.generate(title or description or "", fast=True)
+                                if data.get("objectives"):
+                                    objectives = list(data.get("objectives", []))  # type: ignore[assignment]
+                                    title = str(data.get("title", title) or title)
+                                    description = str(data.get("description", description) or description)
+                        except Exception:
+                            objectives = _expand_to_super_adhd(objectives, title, description)
+                    elif len(objectives) <= 3:
+                        objectives = _expand_to_super_adhd(objectives, title, description)
 
-        non_interactive_input = any([args.line, args.task, args.title, args.steps, args.description])
+            elif mode == "quest":
+                # Single, flexible prompt. Supports: "Title | step1, step2, step3" or free-text intent
+                line = _prompt_input(
+                    "Task (or 'Title | step1, step2, ...'). Leave blank to quit: "
+                ).strip()
+                if not line:
+                    print("Farewell, adventurer!")
+                    break
 
-        if non_interactive_input:
-            if args.line:
-                line = args.line.strip()
                 if "|" in line:
+                    # Inline structured entry
                     raw_title, raw_steps = line.split("|", 1)
                     title = raw_title.strip() or "Untitled Quest"
-                    description = args.description.strip() if isinstance(args.description, str) else ""
+                    description = ""
                     objectives = _parse_objectives(raw_steps)
                     data = {"title": title, "description": description, "objectives": objectives}
                 else:
-                    data = _generate_data_from_intent(line, args.use_llm)
+                    # Free text intent -> generate or fallback template
+                    data = _generate_data_from_intent(line, use_llm)
                     title = str(data.get("title", "Untitled Quest")) or "Untitled Quest"
                     description = str(data.get("description", ""))
                     objectives = list(data.get("objectives", []))  # type: ignore[assignment]
-            elif args.title or args.steps or args.description:
-                title = (args.title or "Untitled Quest").strip() or "Untitled Quest"
-                description = (args.description or "").strip()
-                objectives = _parse_objectives(args.steps or "")
-                if not objectives and args.task:
-                    # fall back to intent generation for steps if steps not provided
-                    data = _generate_data_from_intent(args.task, args.use_llm)
-                    objectives = list(data.get("objectives", []))  # type: ignore[assignment]
-                data = {"title": title, "description": description, "objectives": objectives}
-            elif args.task:
-                data = _generate_data_from_intent(args.task, args.use_llm)
-                title = str(data.get("title", "Untitled Quest")) or "Untitled Quest"
-                description = str(data.get("description", ""))
-                objectives = list(data.get("objectives", []))  # type: ignore[assignment]
-
-            next_action = None
-            total_estimate_mins = None
-            step_style = args.style
-            cue_text = None
-            timer_minutes = None
-
-            # Super ADHD expansion (non-interactive)
-            if args.adhd_mode == "super":
-                if LocalLLMQuestGenerator is not None:
-                    try:
-                        generator = LocalLLMQuestGenerator()
-                        data_g = generator.generate_granular(title or description or "", objectives, fast=True)
-                        gen_objs = list(data_g.get("objectives", []) or [])  # type: ignore[assignment]
-                        if gen_objs:
-                            objectives = [str(o) for o in gen_objs]
-                            title = str(data_g.get("title", title) or title)
-                            description = str(data_g.get("description", description) or description)
-                        else:
-                            # Fallback to coarse generation if granular empty
-                            data = generator.generate(title or description or "", fast=True)
-                            if data.get("objectives"):
-                                objectives = list(data.get("objectives", []))  # type: ignore[assignment]
-                                title = str(data.get("title", title) or title)
-                                description = str(data.get("description", description) or description)
-                    except Exception:
-                        objectives = _expand_to_super_adhd(objectives, title, description)
-                elif len(objectives) <= 3:
-                    objectives = _expand_to_super_adhd(objectives, title, description)
-
-        elif args.mode == "quest":
-            # Single, flexible prompt. Supports: "Title | step1, step2, step3" or free-text intent
-            line = _prompt_input(
-                "Task (or 'Title | step1, step2, ...'). Leave blank to quit: "
-            ).strip()
-            if not line:
-                print("Farewell, adventurer!")
-                break
 
-            if "|" in line:
-                # Inline structured entry
-                raw_title, raw_steps = line.split("|", 1)
-                title = raw_title.strip() or "Untitled Quest"
-                description = ""
-                objectives = _parse_objectives(raw_steps)
-                data = {"title": title, "description": description, "objectives": objectives}
-            else:
-                # Free text intent -> generate or fallback template
-                data = _generate_data_from_intent(line, args.use_llm)
-                title = str(data.get("title", "Untitled Quest")) or "Untitled Quest"
-                description = str(data.get("description", ""))
-                objectives = list(data.get("objectives", []))  # type: ignore[assignment]
-
-            # Defaults to reduce prompts
-            next_action = None
-            total_estimate_mins = None
-            step_style = args.style
-            cue_text = None
-            timer_minutes = None
-
-            # Super ADHD expansion (interactive quest)
-            if args.adhd_mode == "super":
-                # Prefer LLM granular generation; fallback to deterministic expansion
-                if LocalLLMQuestGenerator is not None:
-                    try:
-                        generator = LocalLLMQuestGenerator()
-                        data_g = generator.generate_granular(title or description or "", objectives, fast=True)
-                        # Prefer generated objectives if they exist
-                        gen_objs = list(data_g.get("objectives", []) or [])  # type: ignore[assignment]
-                        if gen_objs:
-                            objectives = [str(o) for o in gen_objs]
-                            # Fill missing title/description if provided
-                            title = str(data_g.get("title", title) or title)
-                            description = str(data_g.get("description", description) or description)
-                        else:
-                            data = generator.generate(title or description or "", fast=True)
-                            if data.get("objectives"):
-                                objectives = list(data.get("objectives", []))  # type: ignore[assignment]
-                                title = str(data.get("title", title) or title)
-                                description = str(data.get("description", description) or description)
-                    except Exception:
+                # Defaults to reduce prompts
+                next_action = None
+                total_estimate_mins = None
+                step_style = style
+                cue_text = None
+                timer_minutes = None
+
+                # Super ADHD expansion (interactive quest)
+                if adhd_mode == "super":
+                    # Prefer LLM granular generation; fallback to deterministic expansion
+                    if LocalLLMQuestGenerator is not None:
+                        try:
+                            generator = _get_llm()
+                            data_g = generator.generate_granular(title or description or "", objectives, fast=True)
+                            # Prefer generated objectives if they exist
+                            gen_objs = list(data_g.get("objectives", []) or [])  # type: ignore[assignment]
+                            if gen_objs:
+                                objectives = [str(o) for o in gen_objs]
+                                # Fill missing title/description if provided
+                                title = str(data_g.get("title", title) or title)
+                                description = str(data_g.get("description", description) or description)
+                            else:
+                                data = generator.generate(title or description or "", fast=True)
+                                if data.get("objectives"):
+                                    objectives = list(data.get("objectives", []))  # type: ignore[assignment]
+                                    title = str(data.get("title", title) or title)
+                                    description = str(data.get("description", description) or description)
+                        except Exception:
+                            objectives = _expand_to_super_adhd(objectives, title, description)
+                    elif len(objectives) <= 3:
                         objectives = _expand_to_super_adhd(objectives, title, description)
-                elif len(objectives) <= 3:
-                    objectives = _expand_to_super_adhd(objectives, title, description)
-        else:
-            # Markdown echo mode: print exactly what the user types, rendered as Markdown
-            text = _prompt_input(
-                "Enter text to print (Markdown supported). Leave blank to quit: "
-            ).strip("\n")
-            if not text:
-                print("Farewell, adventurer!")
-                break
-            # Prepare variables expected by the common print block
-            title = ""
-            description = ""
-            objectives = []
-            next_action = None
-            total_estimate_mins = None
-            step_style = args.style
-            cue_text = None
-            timer_minutes = None
-            data = {}
-        # fallthrough: handled above for quest/markdown modes
-
-        # Print either a quest or raw Markdown, depending on mode
-        print("\nPrinting...")
-        printer = open_printer_from_target(target)
-        try:
-            if args.mode == "markdown" and not non_interactive_input:
+            else:
+                # Markdown echo mode: print exactly what the user types, rendered as Markdown
+                text = _prompt_input(
+                    "Enter text to print (Markdown supported). Leave blank to quit: "
+                ).strip("\n")
+                if not text:
+                    print("Farewell, adventurer!")
+                    break
+                # Prepare variables expected by the common print block
+                title = ""
+                description = ""
+                objectives = []
+                next_action = None
+                total_estimate_mins = None
+                step_style = style
+                cue_text = None
+                timer_minutes = None
+                data = {}
+            # fallthrough: handled above for quest/markdown modes
+
+            # Print either a quest or raw Markdown, depending on mode
+            print("\nPrinting...")
+            # Open once and reuse the handle for later quests in this session
+            if printer is None:
+                printer = open_printer_from_target(target)
+            if mode == "markdown" and not non_interactive_input:
                 # Auto-convert plain text to pleasant Markdown
                 text_md = _auto_markdown_from_text(text)
                 print_markdown_document(printer, text_md)
@@ -704,25 +862,24 @@ def run():
                     qr_link=None,
                     show_time_estimates=False,
                 )
-        finally:
-            try:
-                close_fn = getattr(printer, "close", None)
-                if callable(close_fn):
-                    close_fn()
-            except Exception:
-                pass
 
-        if non_interactive_input or args.once:
-            print("Farewell, adventurer!")
-            break
-        elif args.mode in {"quest", "markdown"}:
-            again = _prompt_input("\nPress Enter to print another, or 'q' to quit: ").strip().lower()
-            if again in {"q", "quit"}:
+            if non_interactive_input or once:
                 print("Farewell, adventurer!")
                 break
-        else:
-            print("Farewell, adventurer!")
-            break
+            elif mode in {"quest", "markdown"}:
+                again = _prompt_input("\nPress Enter to print another, or 'q' to quit: ").strip().lower()
+                if again in {"q", "quit"}:
+                    print("Farewell, adventurer!")
+                    break
+            else:
+                print("Farewell, adventurer!")
+                break
+    finally:
+        if printer is not None:
+            try:
+                printer.close()
+            except Exception:
+                pass
 
 
 if __name__ == "__main__":
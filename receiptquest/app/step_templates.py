@@ -0,0 +1,187 @@
+"""Static checklist templates for the deterministic Super ADHD expansion.
+
+Kept as module-level tuples so they are built once per process. They are
+returned to callers as-is, so they must never be mutated.
+"""
+
+import sys
+from typing import Dict, Tuple
+
+
+def _interned(steps: Tuple[str, ...]) -> Tuple[str, ...]:
+    # Step strings contain spaces, so the compiler does not intern them on its own
+    return tuple(sys.intern(step) for step in steps)
+
+
+# Category bits; receiptquest.app.main maps keywords onto these
+CAT_HOMEWORK = 1 << 0
+CAT_MATH = 1 << 1
+CAT_STUDY = 1 << 2
+CAT_WRITING = 1 << 3
+CAT_SHOWER = 1 << 4
+CAT_CLEANING = 1 << 5
+CAT_EMAIL = 1 << 6
+CAT_WORKOUT = 1 << 7
+CAT_COOKING = 1 << 8
+CAT_LAUNDRY = 1 << 9
+CAT_ERRAND = 1 << 10
+CAT_MINDFUL = 1 << 11
+
+
+# Fixed checklists
+SHOWER_STEPS: Tuple[str, ...] = _interned((
+    "Grab towel and clean clothes",
+    "Put phone away and head to bathroom",
+    "Turn on water, set comfy temperature",
+    "Step in and rinse",
+    "Soap body",
+    "Shampoo hair (if needed)",
+    "Rinse off",
+    "Turn water off",
+    "Towel dry",
+    "Get dressed",
+    "Mark this as done",
+))
+
+CLEANING_STEPS: Tuple[str, ...] = _interned((
+    "Bag up obvious trash",
+    "Gather tools (bin, cloth, spray)",
+    "Clear a small surface",
+    "Sort: keep / relocate / trash",
+    "Wipe the surface",
+    "Return keep items neatly",
+    "Quick sweep or vacuum",
+    "Take trash out",
+    "Take a sip of water",
+    "Mark this as done",
+))
+
+EMAIL_STEPS: Tuple[str, ...] = _interned((
+    "Open inbox/admin tab",
+    "Set a 10-minute focus timer",
+    "Archive obvious noise",
+    "Handle one priority item",
+    "Handle one small item",
+    "If stuck: write a 1-sentence plan",
+    "Schedule remaining for later",
+    "Close the tab",
+    "Mark this as done",
+))
+
+WORKOUT_STEPS: Tuple[str, ...] = _interned((
+    "Change into comfy clothes",
+    "Fill a water bottle",
+    "Warm up for 1 minute",
+    "Do first easy set",
+    "Rest and sip water",
+    "Do second set",
+    "Stretch briefly",
+    "Log that you moved today",
+    "Mark this as done",
+))
+
+COOKING_STEPS: Tuple[str, ...] = _interned((
+    "Wash hands",
+    "Gather ingredients and tools",
+    "Clear a small prep space",
+    "Preheat or boil if needed",
+    "Do the first prep step",
+    "Cook the main part",
+    "Plate the food",
+    "Quick wipe of the counter",
+    "Enjoy a bite and mark done",
+))
+
+LAUNDRY_STEPS: Tuple[str, ...] = _interned((
+    "Collect clothes into hamper",
+    "Load washer (sort if needed)",
+    "Add detergent and start",
+    "Move to dryer",
+    "Fold 5–10 items",
+    "Put folded items away",
+    "Mark this as done",
+))
+
+ERRAND_STEPS: Tuple[str, ...] = _interned((
+    "Write a tiny list (3 items)",
+    "Grab wallet/keys/bags",
+    "Head out the door",
+    "Get the top 1–2 items first",
+    "Get the remaining items",
+    "Return home and unpack",
+    "Put bags away",
+    "Mark this as done",
+))
+
+MINDFUL_STEPS: Tuple[str, ...] = _interned((
+    "Sit comfortably",
+    "Set a 3-minute timer",
+    "Close eyes and breathe",
+    "If distracted: label and return",
+    "Open eyes and stretch",
+    "Mark this as done",
+))
+
+GENERIC_STEPS: Tuple[str, ...] = _interned((
+    "Gather what you need",
+    "Clear a small space and sit/stand to start",
+    "Open the task or next part",
+    "Skim goals (30 seconds)",
+    "Do the first small part",
+    "Take a quick sip of water",
+    "Do the next small chunk",
+    "Quick check and save/put aside",
+    "Put things away",
+    "Mark this as done",
+))
+
+
+STUDY_FAMILY = CAT_HOMEWORK | CAT_MATH | CAT_STUDY | CAT_WRITING
+
+
+def _build_study_steps(is_math: bool, is_homework: bool) -> Tuple[str, ...]:
+    problems = is_math or is_homework
+    return _interned((
+        "Grab a writing utensil",
+        (
+            "Gather materials (notebook, paper, calculator)"
+            if is_math
+            else "Gather materials (notebook, paper)"
+        ),
+        "Clear a small space and sit down",
+        (
+            "Take the homework out and open to the right page"
+            if is_homework
+            else "Open the task and load the next part"
+        ),
+        "Skim the instructions (30 seconds)",
+        "Do the first problem" if problems else "Do the first small part",
+        "Take a quick sip of water",
+        "Do the next 2–3 problems" if problems else "Do the next small chunk",
+        "Quick check and save your work",
+        "Put materials back in your bag/place",
+        "Mark this as done",
+    ))
+
+
+# Study/homework/writing checklist variants keyed by the MATH/HOMEWORK bits of the mask
+STUDY_STEPS: Dict[int, Tuple[str, ...]] = {
+    bits: _build_study_steps(bool(bits & CAT_MATH), bool(bits & CAT_HOMEWORK))
+    for bits in (0, CAT_MATH, CAT_HOMEWORK, CAT_MATH | CAT_HOMEWORK)
+}
+
+# Single-checklist categories keyed by bit, and the order they are tried in
+# after shower and the study family
+STEP_TEMPLATES: Dict[int, Tuple[str, ...]] = {
+    CAT_SHOWER: SHOWER_STEPS,
+    CAT_CLEANING: CLEANING_STEPS,
+    CAT_EMAIL: EMAIL_STEPS,
+    CAT_WORKOUT: WORKOUT_STEPS,
+    CAT_COOKING: COOKING_STEPS,
+    CAT_LAUNDRY: LAUNDRY_STEPS,
+    CAT_ERRAND: ERRAND_STEPS,
+    CAT_MINDFUL: MINDFUL_STEPS,
+}
+PRIORITY_ORDER: Tuple[int, ...] = (
+    CAT_CLEANING, CAT_EMAIL, CAT_WORKOUT, CAT_COOKING, CAT_LAUNDRY, CAT_ERRAND, CAT_MINDFUL
+)
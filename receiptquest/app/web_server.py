@@ -1,17 +1,23 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List, Tuple
+from typing import Any, Deque, Dict, List, Tuple
+import json
 import os
+import re
 import time
+import hashlib
 import secrets
 import threading
-from queue import Queue
+from collections import OrderedDict, deque
+from queue import Full, Queue
+from types import SimpleNamespace
 
-from flask import Flask, request, redirect, url_for, render_template_string, session, abort
+from flask import Flask, Response, request, redirect, url_for, session, abort
 
 from ..printing import open_printer_from_target, print_markdown_document
 from ..printing.quest_formatter import print_supportive_quest
 from ..core.models import Quest, Objective
+from .main import _auto_markdown_from_text, _generate_data_from_intent, _get_llm
 
 
 def _env_str(name: str, default: str = "") -> str:
@@ -21,21 +27,436 @@ def _env_str(name: str, default: str = "") -> str:
     return default
 
 
+# One-shot minifiers for the constant page sources; the templates contain no <pre>/<textarea>,
+# so collapsing whitespace runs never changes how a page renders
+_HTML_COMMENT_RE = re.compile(r"<!--.*?-->", re.DOTALL)
+_CSS_COMMENT_RE = re.compile(r"/\*.*?\*/", re.DOTALL)
+_WHITESPACE_RE = re.compile(r"\s+")
+_CSS_PUNCT_RE = re.compile(r"\s*([{};,])\s*")
+
+
+def _minify_html(src: str) -> str:
+    return _WHITESPACE_RE.sub(" ", _HTML_COMMENT_RE.sub("", src)).strip()
+
+
+def _minify_css(src: str) -> str:
+    return _CSS_PUNCT_RE.sub(r"\1", _WHITESPACE_RE.sub(" ", _CSS_COMMENT_RE.sub("", src))).strip()
+
+
+# Shared stylesheet for every page, served (minified) from /static/app.css so browsers cache it
+APP_CSS = """
+/* CSS Variables for dark pastel blue theme */
+:root {
+  --bg-primary: #0f1628;
+  --bg-secondary: #1a2332;
+  --bg-card: #212b3d;
+  --bg-input: #162030;
+  --accent-blue: #4f8cc9;
+  --accent-light: #6ba3d6;
+  --accent-glow: rgba(79, 140, 201, 0.2);
+  --text-primary: #e8eef7;
+  --text-secondary: #9ca8ba;
+  --text-muted: #6b7a8f;
+  --border-light: #2a3441;
+  --border-focus: #4f8cc9;
+  --success: #4ade80;
+  --error: #f87171;
+  --shadow-card: 0 8px 32px rgba(15, 22, 40, 0.6);
+  --shadow-button: 0 4px 16px rgba(79, 140, 201, 0.3);
+  --radius-sm: 8px;
+  --radius-md: 12px;
+  --radius-lg: 16px;
+  --radius-xl: 20px;
+}
+
+/* Global reset and base styles */
+*, *::before, *::after { box-sizing: border-box; }
+html { scroll-behavior: smooth; }
+body {
+  font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, Oxygen, Ubuntu, Cantarell, sans-serif;
+  margin: 0; padding: 0;
+  background: linear-gradient(135deg, var(--bg-primary) 0%, #0a1220 100%);
+  color: var(--text-primary);
+  line-height: 1.6;
+  min-height: 100vh;
+  -webkit-font-smoothing: antialiased;
+  -moz-osx-font-smoothing: grayscale;
+  overflow-x: hidden;
+}
+
+/* Animated background particles */
+body::before {
+  content: '';
+  position: fixed;
+  top: 0; left: 0; right: 0; bottom: 0;
+  background: radial-gradient(circle at 20% 80%, rgba(79, 140, 201, 0.05) 0%, transparent 50%),
+              radial-gradient(circle at 80% 20%, rgba(79, 140, 201, 0.03) 0%, transparent 50%);
+  pointer-events: none;
+  z-index: -1;
+}
+
+/* Main content area - no header needed */
+main {
+  max-width: 420px;
+  margin: 0 auto;
+  padding: 32px 16px 80px;
+  position: relative;
+  z-index: 1;
+  min-height: 100vh;
+  display: flex;
+  flex-direction: column;
+  justify-content: center;
+}
+@media (max-width: 480px) {
+  main { padding: 24px 12px 80px; }
+}
+
+/* Beautiful card with animations */
+.card {
+  background: rgba(33, 43, 61, 0.7);
+  backdrop-filter: blur(20px);
+  border: 1px solid var(--border-light);
+  border-radius: var(--radius-xl);
+  padding: 32px;
+  box-shadow: var(--shadow-card);
+  animation: cardFloat 0.8s ease-out, fadeInUp 0.6s ease-out;
+  position: relative;
+  overflow: hidden;
+}
+.card::before {
+  content: '';
+  position: absolute;
+  top: 0; left: 0; right: 0;
+  height: 1px;
+  background: linear-gradient(90deg, transparent 0%, var(--accent-glow) 50%, transparent 100%);
+  animation: shimmer 2s ease-in-out infinite;
+}
+
+/* Form styling */
+form { margin: 0; }
+h2 {
+  margin: 0 0 20px 0;
+  font-size: 24px;
+  font-weight: 600;
+  color: var(--text-primary);
+  animation: fadeInUp 0.7s ease-out 0.2s both;
+}
+
+/* Hero input with special styling */
+.hero-input {
+  margin: 24px 0;
+  position: relative;
+  animation: fadeInUp 0.7s ease-out 0.3s both;
+}
+.hero-input input[type=text] {
+  width: 100%;
+  padding: 20px 18px;
+  background: rgba(22, 32, 48, 0.8);
+  border: 2px solid var(--border-light);
+  border-radius: var(--radius-lg);
+  color: var(--text-primary);
+  font-size: 18px;
+  font-weight: 500;
+  outline: none;
+  transition: all 0.3s cubic-bezier(0.4, 0, 0.2, 1);
+  -webkit-tap-highlight-color: transparent;
+}
+.hero-input input[type=text]:focus {
+  border-color: var(--border-focus);
+  box-shadow: 0 0 0 4px var(--accent-glow), 0 8px 24px rgba(79, 140, 201, 0.15);
+  transform: translateY(-2px);
+}
+.hero-input input[type=text]::placeholder {
+  color: var(--text-muted);
+  opacity: 0.8;
+}
+
+/* Labels and form inputs */
+label {
+  display: block;
+  margin: 16px 0 8px;
+  font-size: 14px;
+  font-weight: 500;
+  color: var(--text-secondary);
+  letter-spacing: 0.3px;
+}
+input[type=text], input[type=password], textarea, select {
+  width: 100%;
+  padding: 14px 16px;
+  background: rgba(22, 32, 48, 0.6);
+  border: 1px solid var(--border-light);
+  border-radius: var(--radius-md);
+  color: var(--text-primary);
+  font-size: 16px;
+  outline: none;
+  transition: all 0.3s ease;
+  -webkit-tap-highlight-color: transparent;
+}
+input:focus, textarea:focus, select:focus {
+  border-color: var(--border-focus);
+  box-shadow: 0 0 0 3px var(--accent-glow);
+  background: rgba(22, 32, 48, 0.9);
+}
+textarea {
+  min-height: 100px;
+  resize: vertical;
+  font-family: inherit;
+  line-height: 1.5;
+}
+
+/* Grid layout */
+.row {
+  display: grid;
+  grid-template-columns: 1fr 1fr;
+  gap: 16px;
+  margin-top: 16px;
+}
+@media (max-width: 480px) {
+  .row { grid-template-columns: 1fr; gap: 12px; }
+}
+
+/* Collapsible details */
+details {
+  margin-top: 20px;
+  animation: fadeInUp 0.7s ease-out 0.4s both;
+}
+summary {
+  cursor: pointer;
+  color: var(--text-secondary);
+  font-size: 14px;
+  font-weight: 500;
+  padding: 8px 0;
+  transition: color 0.3s ease;
+  user-select: none;
+  -webkit-tap-highlight-color: transparent;
+}
+summary:hover { color: var(--accent-light); }
+details[open] summary { color: var(--accent-light); margin-bottom: 12px; }
+
+/* Action buttons - inline with content */
+.actions {
+  padding: 32px 0 0;
+  display: flex;
+  gap: 12px;
+  justify-content: center;
+  animation: fadeInUp 0.6s ease-out 0.5s both;
+}
+.actions.fixed {
+  position: fixed;
+  bottom: 0; left: 0; right: 0;
+  padding: 20px 16px 20px;
+  background: rgba(26, 35, 50, 0.9);
+  backdrop-filter: blur(20px);
+  border-top: 1px solid var(--border-light);
+  z-index: 200;
+}
+@supports (padding: max(0px)) {
+  .actions.fixed { padding-bottom: max(20px, env(safe-area-inset-bottom)); }
+}
+
+/* Beautiful buttons with animations */
+.btn {
+  display: inline-flex;
+  align-items: center;
+  justify-content: center;
+  padding: 14px 24px;
+  border: none;
+  border-radius: var(--radius-md);
+  font-size: 16px;
+  font-weight: 600;
+  text-decoration: none;
+  cursor: pointer;
+  transition: all 0.3s cubic-bezier(0.4, 0, 0.2, 1);
+  position: relative;
+  overflow: hidden;
+  -webkit-tap-highlight-color: transparent;
+  user-select: none;
+  min-width: 120px;
+}
+.btn:active { transform: scale(0.98); }
+
+/* Primary button */
+.btn:not(.secondary) {
+  background: linear-gradient(135deg, var(--accent-blue) 0%, var(--accent-light) 100%);
+  color: white;
+  box-shadow: var(--shadow-button);
+}
+.btn:not(.secondary):hover {
+  transform: translateY(-2px);
+  box-shadow: 0 6px 20px rgba(79, 140, 201, 0.4);
+}
+
+/* Secondary button */
+.btn.secondary {
+  background: rgba(42, 52, 65, 0.8);
+  color: var(--text-secondary);
+  border: 1px solid var(--border-light);
+}
+.btn.secondary:hover {
+  background: rgba(42, 52, 65, 1);
+  color: var(--text-primary);
+  border-color: var(--border-focus);
+}
+
+/* Button ripple effect */
+.btn::before {
+  content: '';
+  position: absolute;
+  top: 50%; left: 50%;
+  width: 0; height: 0;
+  border-radius: 50%;
+  background: rgba(255, 255, 255, 0.2);
+  transform: translate(-50%, -50%);
+  transition: width 0.6s, height 0.6s;
+  pointer-events: none;
+}
+.btn:active::before {
+  width: 300px;
+  height: 300px;
+}
+
+/* Status messages */
+.success, .error {
+  margin-top: 16px;
+  padding: 12px 16px;
+  border-radius: var(--radius-md);
+  font-size: 14px;
+  font-weight: 500;
+  animation: fadeInUp 0.5s ease-out;
+}
+.success {
+  background: rgba(74, 222, 128, 0.1);
+  color: var(--success);
+  border: 1px solid rgba(74, 222, 128, 0.2);
+}
+.error {
+  background: rgba(248, 113, 113, 0.1);
+  color: var(--error);
+  border: 1px solid rgba(248, 113, 113, 0.2);
+}
+
+/* Typography */
+.muted {
+  color: var(--text-muted);
+  font-size: 13px;
+  line-height: 1.5;
+}
+a { color: var(--accent-light); text-decoration: none; transition: color 0.3s ease; }
+a:hover { color: var(--accent-blue); }
+code {
+  background: rgba(22, 32, 48, 0.8);
+  padding: 2px 6px;
+  border-radius: 4px;
+  font-size: 12px;
+  color: var(--accent-light);
+}
+
+/* Animations */
+@keyframes fadeInUp {
+  from { opacity: 0; transform: translateY(20px); }
+  to { opacity: 1; transform: translateY(0); }
+}
+@keyframes slideDown {
+  from { opacity: 0; transform: translateY(-20px); }
+  to { opacity: 1; transform: translateY(0); }
+}
+@keyframes slideUp {
+  from { opacity: 0; transform: translateY(20px); }
+  to { opacity: 1; transform: translateY(0); }
+}
+@keyframes cardFloat {
+  0% { transform: translateY(0px); }
+  50% { transform: translateY(-4px); }
+  100% { transform: translateY(0px); }
+}
+@keyframes shimmer {
+  0% { opacity: 0; }
+  50% { opacity: 1; }
+  100% { opacity: 0; }
+}
+
+/* Smooth focus indicators for accessibility */
+*:focus-visible {
+  outline: 2px solid var(--accent-blue);
+  outline-offset: 2px;
+}
+
+/* Loading states */
+.loading {
+  position: relative;
+  pointer-events: none;
+  opacity: 0.7;
+}
+.loading::after {
+  content: '';
+  position: absolute;
+  top: 50%; left: 50%;
+  width: 20px; height: 20px;
+  border: 2px solid transparent;
+  border-top: 2px solid var(--accent-blue);
+  border-radius: 50%;
+  animation: spin 1s linear infinite;
+  transform: translate(-50%, -50%);
+}
+@keyframes spin {
+  to { transform: translate(-50%, -50%) rotate(360deg); }
+}
+
+/* Responsive safe areas */
+@supports (padding: max(0px)) {
+  body { padding-bottom: env(safe-area-inset-bottom); }
+}
+"""
+APP_CSS_BYTES = _minify_css(APP_CSS).encode("utf-8")
+APP_CSS_ETAG = hashlib.blake2b(APP_CSS_BYTES, digest_size=8).hexdigest()
+
+# The PWA manifest never changes at runtime, so it is serialized once
+APP_MANIFEST: Dict[str, Any] = {
+    "name": "Receipt Quest - Task Printer",
+    "short_name": "Receipt Quest",
+    "description": "Transform any task into detailed, printable quest receipts",
+    "start_url": "/",
+    "display": "standalone",
+    "background_color": "#0f1628",
+    "theme_color": "#4f8cc9",
+    "orientation": "portrait",
+    "scope": "/",
+    "lang": "en",
+    "categories": ["productivity", "utilities"],
+    "icons": [
+        {
+            "src": "data:image/svg+xml;base64,PHN2ZyB3aWR0aD0iMTkyIiBoZWlnaHQ9IjE5MiIgdmlld0JveD0iMCAwIDE5MiAxOTIiIGZpbGw9Im5vbmUiIHhtbG5zPSJodHRwOi8vd3d3LnczLm9yZy8yMDAwL3N2ZyI+CjxyZWN0IHdpZHRoPSIxOTIiIGhlaWdodD0iMTkyIiByeD0iNDAiIGZpbGw9IiMwZjE2MjgiLz4KPHJlY3QgeD0iMzIiIHk9IjMyIiB3aWR0aD0iMTI4IiBoZWlnaHQ9IjE2MCIgcng9IjE2IiBmaWxsPSIjNGY4Y2M5IiBmaWxsLW9wYWNpdHk9IjAuMiIvPgo8cGF0aCBkPSJNNjQgODBoMjRNNjQgOTZoNDBNNjQgMTEyaDMyTTY0IDEyOGgyNCIgc3Ryb2tlPSIjNGY4Y2M5IiBzdHJva2Utd2lkdGg9IjQiIHN0cm9rZS1saW5lY2FwPSJyb3VuZCIvPgo8Y2lyY2xlIGN4PSI5NiIgY3k9IjY0IiByPSIxNiIgZmlsbD0iIzRmOGNjOSIvPgo8L3N2Zz4K",
+            "sizes": "192x192",
+            "type": "image/svg+xml",
+            "purpose": "any maskable"
+        }
+    ]
+}
+APP_MANIFEST_BYTES = json.dumps(APP_MANIFEST, separators=(",", ":")).encode("utf-8")
+APP_MANIFEST_ETAG = hashlib.blake2b(APP_MANIFEST_BYTES, digest_size=8).hexdigest()
+
+
 def create_app(
     printer_target: Tuple[str, Any],
     default_step_style: str = "checkbox",
     use_llm: bool = True,
     adhd_mode: str = "super",
 ) -> Flask:
-    # Load environment variables from .env-like files before reading config
-    try:
-        from .config import load_env_from_files  # type: ignore
-        load_env_from_files(override=False)
-    except Exception:
-        pass
     app = Flask(__name__)
-    # Config and first-run setup
-    from .config import load_config, save_credentials, generate_secret_key, verify_password
+    # Config and first-run setup (load_config also loads .env-like files on first use)
+    from .config import (
+        load_config,
+        save_credentials,
+        generate_secret_key,
+        verify_password,
+        needs_rehash,
+        default_cost,
+        get_config_path,
+        _hash_password,
+        _read_json_file,
+        _write_json_file,
+        DEFAULT_KDF,
+    )
     cfg, needs_setup = load_config()
     secret_key = cfg.get("RQS_SECRET_KEY") or generate_secret_key()
     app.secret_key = secret_key
@@ -47,25 +468,69 @@ def create_app(
         vv = v.strip().lower()
         return vv in {"1", "true", "yes", "on"}
 
+    # Environment snapshot (env files were loaded by load_config above); handlers read these
+    # attributes instead of calling os.getenv per request
+    try:
+        queue_max = max(1, int(os.getenv("RQS_QUEUE_MAX", "64")))
+    except ValueError:
+        queue_max = 64
+    env = SimpleNamespace(
+        cookie_secure=_env_bool("RQS_COOKIE_SECURE", False),
+        hsts=_env_bool("RQS_HSTS", False),
+        queue_max=queue_max,
+        hash_from_env=bool(os.getenv("RQS_WEB_HASH")),
+        web_pass=os.getenv("RQS_WEB_PASS") or "",
+        web_user=_env_str("RQS_WEB_USER"),
+    )
+
     app.config.update({
         "SESSION_COOKIE_HTTPONLY": True,
         "SESSION_COOKIE_SAMESITE": "Lax",
-        "SESSION_COOKIE_SECURE": _env_bool("RQS_COOKIE_SECURE", False),
+        "SESSION_COOKIE_SECURE": env.cookie_secure,
         "PERMANENT_SESSION_LIFETIME": 60 * 60 * 8,  # 8 hours
     })
     username = cfg.get("RQS_WEB_USER", "")
     password_hash = cfg.get("RQS_WEB_HASH", "")
     password_salt = cfg.get("RQS_WEB_SALT", "")
-    
-    # Validate PBKDF2 iterations with safe fallback
+    password_kdf = cfg.get("RQS_KDF", "pbkdf2")
+
+    # Validate the KDF cost with a safe fallback for that KDF
     try:
-        password_iters = int(cfg.get("RQS_PBKDF2_ITERATIONS", "200000") or "200000")
+        password_iters = int(cfg.get("RQS_PBKDF2_ITERATIONS") or default_cost(password_kdf))
         if password_iters <= 0:
             raise ValueError("Iterations must be positive")
     except (ValueError, TypeError) as e:
         import logging
-        logging.warning(f"Invalid PBKDF2 iterations config: {e}. Using default 200000.")
-        password_iters = 200000
+        password_iters = default_cost(password_kdf)
+        logging.warning(f"Invalid PBKDF2 iterations config: {e}. Using default {password_iters}.")
+
+    # Stand-in credential for logins with no stored hash, so the failure path always pays
+    # one full KDF run and its latency does not reveal the config state
+    dummy_salt, dummy_hash, dummy_cost = _hash_password(secrets.token_hex(16))
+
+    # Recently rejected passwords for the current hash, as keyed digests (never plaintext);
+    # a repeated wrong guess is refused without another KDF run
+    rejected_passwords: "OrderedDict[bytes, None]" = OrderedDict()
+    rejected_key = secrets.token_bytes(32)
+    rejected_lock = threading.Lock()
+
+    def _check_password(pw: str, salt_hex: str, hash_hex: str, iters: int, kdf: str) -> bool:
+        digest = hashlib.blake2b(
+            "\0".join((salt_hex, hash_hex, pw)).encode("utf-8", "surrogatepass"),
+            key=rejected_key,
+            digest_size=16,
+        ).digest()
+        with rejected_lock:
+            if digest in rejected_passwords:
+                rejected_passwords.move_to_end(digest)
+                return False
+        if verify_password(pw, salt_hex, hash_hex, iters, kdf):
+            return True
+        with rejected_lock:
+            rejected_passwords[digest] = None
+            if len(rejected_passwords) > 256:
+                rejected_passwords.popitem(last=False)
+        return False
 
     # Beautiful mobile-first dark pastel blue UI
     base_html = """
@@ -75,369 +540,7 @@ def create_app(
   <meta charset=\"utf-8\">
   <meta name=\"viewport\" content=\"width=device-width, initial-scale=1, user-scalable=no\">
   <title>Receipt Quest</title>
-  <style>
-    /* CSS Variables for dark pastel blue theme */
-    :root {
-      --bg-primary: #0f1628;
-      --bg-secondary: #1a2332;
-      --bg-card: #212b3d;
-      --bg-input: #162030;
-      --accent-blue: #4f8cc9;
-      --accent-light: #6ba3d6;
-      --accent-glow: rgba(79, 140, 201, 0.2);
-      --text-primary: #e8eef7;
-      --text-secondary: #9ca8ba;
-      --text-muted: #6b7a8f;
-      --border-light: #2a3441;
-      --border-focus: #4f8cc9;
-      --success: #4ade80;
-      --error: #f87171;
-      --shadow-card: 0 8px 32px rgba(15, 22, 40, 0.6);
-      --shadow-button: 0 4px 16px rgba(79, 140, 201, 0.3);
-      --radius-sm: 8px;
-      --radius-md: 12px;
-      --radius-lg: 16px;
-      --radius-xl: 20px;
-    }
-
-    /* Global reset and base styles */
-    *, *::before, *::after { box-sizing: border-box; }
-    html { scroll-behavior: smooth; }
-    body {
-      font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, Oxygen, Ubuntu, Cantarell, sans-serif;
-      margin: 0; padding: 0;
-      background: linear-gradient(135deg, var(--bg-primary) 0%, #0a1220 100%);
-      color: var(--text-primary);
-      line-height: 1.6;
-      min-height: 100vh;
-      -webkit-font-smoothing: antialiased;
-      -moz-osx-font-smoothing: grayscale;
-      overflow-x: hidden;
-    }
-
-    /* Animated background particles */
-    body::before {
-      content: '';
-      position: fixed;
-      top: 0; left: 0; right: 0; bottom: 0;
-      background: radial-gradient(circle at 20% 80%, rgba(79, 140, 201, 0.05) 0%, transparent 50%),
-                  radial-gradient(circle at 80% 20%, rgba(79, 140, 201, 0.03) 0%, transparent 50%);
-      pointer-events: none;
-      z-index: -1;
-    }
-
-    /* Main content area - no header needed */
-    main {
-      max-width: 420px;
-      margin: 0 auto;
-      padding: 32px 16px 80px;
-      position: relative;
-      z-index: 1;
-      min-height: 100vh;
-      display: flex;
-      flex-direction: column;
-      justify-content: center;
-    }
-    @media (max-width: 480px) {
-      main { padding: 24px 12px 80px; }
-    }
-
-    /* Beautiful card with animations */
-    .card {
-      background: rgba(33, 43, 61, 0.7);
-      backdrop-filter: blur(20px);
-      border: 1px solid var(--border-light);
-      border-radius: var(--radius-xl);
-      padding: 32px;
-      box-shadow: var(--shadow-card);
-      animation: cardFloat 0.8s ease-out, fadeInUp 0.6s ease-out;
-      position: relative;
-      overflow: hidden;
-    }
-    .card::before {
-      content: '';
-      position: absolute;
-      top: 0; left: 0; right: 0;
-      height: 1px;
-      background: linear-gradient(90deg, transparent 0%, var(--accent-glow) 50%, transparent 100%);
-      animation: shimmer 2s ease-in-out infinite;
-    }
-
-    /* Form styling */
-    form { margin: 0; }
-    h2 {
-      margin: 0 0 20px 0;
-      font-size: 24px;
-      font-weight: 600;
-      color: var(--text-primary);
-      animation: fadeInUp 0.7s ease-out 0.2s both;
-    }
-
-    /* Hero input with special styling */
-    .hero-input {
-      margin: 24px 0;
-      position: relative;
-      animation: fadeInUp 0.7s ease-out 0.3s both;
-    }
-    .hero-input input[type=text] {
-      width: 100%;
-      padding: 20px 18px;
-      background: rgba(22, 32, 48, 0.8);
-      border: 2px solid var(--border-light);
-      border-radius: var(--radius-lg);
-      color: var(--text-primary);
-      font-size: 18px;
-      font-weight: 500;
-      outline: none;
-      transition: all 0.3s cubic-bezier(0.4, 0, 0.2, 1);
-      -webkit-tap-highlight-color: transparent;
-    }
-    .hero-input input[type=text]:focus {
-      border-color: var(--border-focus);
-      box-shadow: 0 0 0 4px var(--accent-glow), 0 8px 24px rgba(79, 140, 201, 0.15);
-      transform: translateY(-2px);
-    }
-    .hero-input input[type=text]::placeholder {
-      color: var(--text-muted);
-      opacity: 0.8;
-    }
-
-    /* Labels and form inputs */
-    label {
-      display: block;
-      margin: 16px 0 8px;
-      font-size: 14px;
-      font-weight: 500;
-      color: var(--text-secondary);
-      letter-spacing: 0.3px;
-    }
-    input[type=text], input[type=password], textarea, select {
-      width: 100%;
-      padding: 14px 16px;
-      background: rgba(22, 32, 48, 0.6);
-      border: 1px solid var(--border-light);
-      border-radius: var(--radius-md);
-      color: var(--text-primary);
-      font-size: 16px;
-      outline: none;
-      transition: all 0.3s ease;
-      -webkit-tap-highlight-color: transparent;
-    }
-    input:focus, textarea:focus, select:focus {
-      border-color: var(--border-focus);
-      box-shadow: 0 0 0 3px var(--accent-glow);
-      background: rgba(22, 32, 48, 0.9);
-    }
-    textarea {
-      min-height: 100px;
-      resize: vertical;
-      font-family: inherit;
-      line-height: 1.5;
-    }
-
-    /* Grid layout */
-    .row {
-      display: grid;
-      grid-template-columns: 1fr 1fr;
-      gap: 16px;
-      margin-top: 16px;
-    }
-    @media (max-width: 480px) {
-      .row { grid-template-columns: 1fr; gap: 12px; }
-    }
-
-    /* Collapsible details */
-    details {
-      margin-top: 20px;
-      animation: fadeInUp 0.7s ease-out 0.4s both;
-    }
-    summary {
-      cursor: pointer;
-      color: var(--text-secondary);
-      font-size: 14px;
-      font-weight: 500;
-      padding: 8px 0;
-      transition: color 0.3s ease;
-      user-select: none;
-      -webkit-tap-highlight-color: transparent;
-    }
-    summary:hover { color: var(--accent-light); }
-    details[open] summary { color: var(--accent-light); margin-bottom: 12px; }
-
-    /* Action buttons - inline with content */
-    .actions {
-      padding: 32px 0 0;
-      display: flex;
-      gap: 12px;
-      justify-content: center;
-      animation: fadeInUp 0.6s ease-out 0.5s both;
-    }
-    .actions.fixed {
-      position: fixed;
-      bottom: 0; left: 0; right: 0;
-      padding: 20px 16px 20px;
-      background: rgba(26, 35, 50, 0.9);
-      backdrop-filter: blur(20px);
-      border-top: 1px solid var(--border-light);
-      z-index: 200;
-    }
-    @supports (padding: max(0px)) {
-      .actions.fixed { padding-bottom: max(20px, env(safe-area-inset-bottom)); }
-    }
-
-    /* Beautiful buttons with animations */
-    .btn {
-      display: inline-flex;
-      align-items: center;
-      justify-content: center;
-      padding: 14px 24px;
-      border: none;
-      border-radius: var(--radius-md);
-      font-size: 16px;
-      font-weight: 600;
-      text-decoration: none;
-      cursor: pointer;
-      transition: all 0.3s cubic-bezier(0.4, 0, 0.2, 1);
-      position: relative;
-      overflow: hidden;
-      -webkit-tap-highlight-color: transparent;
-      user-select: none;
-      min-width: 120px;
-    }
-    .btn:active { transform: scale(0.98); }
-    
-    /* Primary button */
-    .btn:not(.secondary) {
-      background: linear-gradient(135deg, var(--accent-blue) 0%, var(--accent-light) 100%);
-      color: white;
-      box-shadow: var(--shadow-button);
-    }
-    .btn:not(.secondary):hover {
-      transform: translateY(-2px);
-      box-shadow: 0 6px 20px rgba(79, 140, 201, 0.4);
-    }
-    
-    /* Secondary button */
-    .btn.secondary {
-      background: rgba(42, 52, 65, 0.8);
-      color: var(--text-secondary);
-      border: 1px solid var(--border-light);
-    }
-    .btn.secondary:hover {
-      background: rgba(42, 52, 65, 1);
-      color: var(--text-primary);
-      border-color: var(--border-focus);
-    }
-
-    /* Button ripple effect */
-    .btn::before {
-      content: '';
-      position: absolute;
-      top: 50%; left: 50%;
-      width: 0; height: 0;
-      border-radius: 50%;
-      background: rgba(255, 255, 255, 0.2);
-      transform: translate(-50%, -50%);
-      transition: width 0.6s, height 0.6s;
-      pointer-events: none;
-    }
-    .btn:active::before {
-      width: 300px;
-      height: 300px;
-    }
-
-    /* Status messages */
-    .success, .error {
-      margin-top: 16px;
-      padding: 12px 16px;
-      border-radius: var(--radius-md);
-      font-size: 14px;
-      font-weight: 500;
-      animation: fadeInUp 0.5s ease-out;
-    }
-    .success {
-      background: rgba(74, 222, 128, 0.1);
-      color: var(--success);
-      border: 1px solid rgba(74, 222, 128, 0.2);
-    }
-    .error {
-      background: rgba(248, 113, 113, 0.1);
-      color: var(--error);
-      border: 1px solid rgba(248, 113, 113, 0.2);
-    }
-
-    /* Typography */
-    .muted {
-      color: var(--text-muted);
-      font-size: 13px;
-      line-height: 1.5;
-    }
-    a { color: var(--accent-light); text-decoration: none; transition: color 0.3s ease; }
-    a:hover { color: var(--accent-blue); }
-    code {
-      background: rgba(22, 32, 48, 0.8);
-      padding: 2px 6px;
-      border-radius: 4px;
-      font-size: 12px;
-      color: var(--accent-light);
-    }
-
-    /* Animations */
-    @keyframes fadeInUp {
-      from { opacity: 0; transform: translateY(20px); }
-      to { opacity: 1; transform: translateY(0); }
-    }
-    @keyframes slideDown {
-      from { opacity: 0; transform: translateY(-20px); }
-      to { opacity: 1; transform: translateY(0); }
-    }
-    @keyframes slideUp {
-      from { opacity: 0; transform: translateY(20px); }
-      to { opacity: 1; transform: translateY(0); }
-    }
-    @keyframes cardFloat {
-      0% { transform: translateY(0px); }
-      50% { transform: translateY(-4px); }
-      100% { transform: translateY(0px); }
-    }
-    @keyframes shimmer {
-      0% { opacity: 0; }
-      50% { opacity: 1; }
-      100% { opacity: 0; }
-    }
-
-    /* Smooth focus indicators for accessibility */
-    *:focus-visible {
-      outline: 2px solid var(--accent-blue);
-      outline-offset: 2px;
-    }
-
-    /* Loading states */
-    .loading {
-      position: relative;
-      pointer-events: none;
-      opacity: 0.7;
-    }
-    .loading::after {
-      content: '';
-      position: absolute;
-      top: 50%; left: 50%;
-      width: 20px; height: 20px;
-      border: 2px solid transparent;
-      border-top: 2px solid var(--accent-blue);
-      border-radius: 50%;
-      animation: spin 1s linear infinite;
-      transform: translate(-50%, -50%);
-    }
-    @keyframes spin {
-      to { transform: translate(-50%, -50%) rotate(360deg); }
-    }
-
-    /* Responsive safe areas */
-    @supports (padding: max(0px)) {
-      body { padding-bottom: env(safe-area-inset-bottom); }
-    }
-  </style>
+  <link rel=\"stylesheet\" href=\"{{ css_href }}\">
   <meta name=\"color-scheme\" content=\"dark\">
   <meta name=\"theme-color\" content=\"#0f1628\">
   <meta name=\"format-detection\" content=\"telephone=no\">
@@ -454,7 +557,7 @@ def create_app(
   </main>
 </body>
 </html>
-"""
+""".replace("{{ css_href }}", f"/static/app.css?v={APP_CSS_ETAG}")
 
     setup_html = """
   <div style=\"text-align: center; margin-bottom: 32px;\">
@@ -544,30 +647,60 @@ def create_app(
   </style>
 """
 
+    # The shell has a single {{ content|safe }} slot, so pages are spliced into it with plain
+    # concatenation and only the small inner templates go through Jinja
+    # The shell halves are kept as UTF-8 bytes, so only the inner page is encoded per request;
+    # Flask sets Content-Length from the bytes body
+    base_prefix, slot, base_suffix = _minify_html(base_html).partition("{{ content|safe }}")
+    if slot:
+        base_prefix_bytes = base_prefix.encode("utf-8")
+        base_suffix_bytes = base_suffix.encode("utf-8")
+
+        def _wrap(content: str) -> bytes:
+            return base_prefix_bytes + content.encode("utf-8") + base_suffix_bytes
+    else:
+        base_tpl = app.jinja_env.from_string(_minify_html(base_html))
+
+        def _wrap(content: str) -> bytes:
+            return base_tpl.render(content=content).encode("utf-8")
+
+    # Compile each inner template once (minified); render_template_string re-parses its source
+    # on every call
+    setup_tpl = app.jinja_env.from_string(_minify_html(setup_html))
+    login_tpl = app.jinja_env.from_string(_minify_html(login_html))
+    home_tpl = app.jinja_env.from_string(_minify_html(home_html))
+    printed_tpl = app.jinja_env.from_string(_minify_html(printed_html))
+    printed_cache: Dict[str, bytes] = {}
+
     def _is_logged_in() -> bool:
         return bool(session.get("auth") == "ok")
 
+    # Security headers are fixed for the app's lifetime, so the dict is built once
+    secure_headers: Dict[str, str] = {
+        "X-Content-Type-Options": "nosniff",
+        "X-Frame-Options": "DENY",
+        "Referrer-Policy": "no-referrer",
+        # CSP: allow only same-origin, inline styles (no scripts), forms only to self
+        "Content-Security-Policy": (
+            "default-src 'none'; style-src 'self' 'unsafe-inline'; img-src 'self' data:; font-src 'self'; "
+            "connect-src 'self'; form-action 'self'; base-uri 'none'; frame-ancestors 'none'"
+        ),
+        "Permissions-Policy": "geolocation=(), microphone=(), camera=()",
+        # Do not use legacy XSS filter
+        "X-XSS-Protection": "0",
+    }
+    # Optional HSTS (only enable when served via HTTPS)
+    if env.hsts:
+        secure_headers["Strict-Transport-Security"] = "max-age=63072000; includeSubDomains"
+
     def _apply_secure_headers(resp):
-        try:
-            resp.headers.setdefault("X-Content-Type-Options", "nosniff")
-            resp.headers.setdefault("X-Frame-Options", "DENY")
-            resp.headers.setdefault("Referrer-Policy", "no-referrer")
-            # CSP: allow only same-origin, inline styles (no scripts), forms only to self
-            resp.headers.setdefault(
-                "Content-Security-Policy",
-                "default-src 'none'; style-src 'self' 'unsafe-inline'; img-src 'self' data:; font-src 'self'; connect-src 'self'; form-action 'self'; base-uri 'none'; frame-ancestors 'none'"
-            )
-            resp.headers.setdefault("Permissions-Policy", "geolocation=(), microphone=(), camera=()")
-            # Do not use legacy XSS filter
-            resp.headers.setdefault("X-XSS-Protection", "0")
-            # Avoid caching auth pages
-            resp.headers.setdefault("Cache-Control", "no-store")
-            resp.headers.setdefault("Pragma", "no-cache")
-            # Optional HSTS (only enable when served via HTTPS)
-            if os.getenv("RQS_HSTS", "0").strip().lower() in {"1", "true", "yes", "on"}:
-                resp.headers.setdefault("Strict-Transport-Security", "max-age=63072000; includeSubDomains")
-        except Exception:
-            pass
+        headers = resp.headers
+        for key, value in secure_headers.items():
+            headers.setdefault(key, value)
+        # Avoid caching auth pages (static assets set their own Cache-Control)
+        if "Cache-Control" not in headers:
+            headers["Cache-Control"] = "no-store"
+            headers.setdefault("Pragma", "no-cache")
         return resp
 
     # Simple CSRF token
@@ -579,54 +712,83 @@ def create_app(
         return token
 
     def _require_csrf(form: Dict[str, Any]) -> None:
-        token = str(form.get("csrf_token", ""))
-        session_token = str(session.get("csrf_token", ""))
-        if not secrets.compare_digest(token, session_token):
+        # Compare as bytes: str operands must be ASCII, so a non-ASCII form value would raise
+        session_token = session.get("csrf_token")
+        if not isinstance(session_token, str) or not session_token:
+            abort(400)
+        token = str(form.get("csrf_token", "")).encode("utf-8", "surrogateescape")
+        if not secrets.compare_digest(token, session_token.encode("ascii")):
             abort(400)
 
-    # Login throttling (IP-based)
-    login_attempts: Dict[str, List[float]] = {}
+    # Login throttling (IP-based): failed-attempt timestamps per IP, oldest first
+    login_attempts: Dict[str, Deque[float]] = {}
     login_lock = threading.Lock()
+    login_window_seconds = 300
 
-    def _too_many_attempts(client_ip: str, max_attempts: int = 5, window_seconds: int = 300) -> bool:
-        now = time.time()
+    def _too_many_attempts(
+        client_ip: str, max_attempts: int = 5, window_seconds: int = login_window_seconds
+    ) -> bool:
+        now = time.monotonic()
         with login_lock:
-            arr = [t for t in login_attempts.get(client_ip, []) if now - t < window_seconds]
-            login_attempts[client_ip] = arr
-            return len(arr) >= max_attempts
+            dq = login_attempts.get(client_ip)
+            if not dq:
+                return False
+            while dq and now - dq[0] >= window_seconds:
+                dq.popleft()
+            return len(dq) >= max_attempts
 
     def _record_attempt(client_ip: str) -> None:
         with login_lock:
-            login_attempts.setdefault(client_ip, []).append(time.time())
+            login_attempts.setdefault(client_ip, deque()).append(time.monotonic())
+
+    def _sweep_login_attempts() -> None:
+        """Forget IPs whose attempts have all expired, so the map stays bounded off the request path"""
+        while True:
+            time.sleep(60)
+            cutoff = time.monotonic() - login_window_seconds
+            with login_lock:
+                for ip in [ip for ip, dq in login_attempts.items() if not dq or dq[-1] <= cutoff]:
+                    del login_attempts[ip]
+
+    threading.Thread(target=_sweep_login_attempts, name="rqs-login-sweeper", daemon=True).start()
+
+    # Endpoints reachable without a session; every other route needs setup done and a login
+    public_endpoints = {"setup_get", "setup_post", "login_get", "login_post", "logout", "app_css", "manifest"}
+
+    @app.before_request
+    def require_login():
+        if request.endpoint is None or request.endpoint in public_endpoints:
+            return None
+        if needs_setup and request.method == "GET":
+            return redirect(url_for("setup_get"))
+        if not _is_logged_in():
+            if request.method != "GET":
+                abort(401)
+            return redirect(url_for("login_get"))
+        return None
 
     @app.get("/setup")
     def setup_get():
         if not needs_setup:
             return redirect(url_for("home"))
-        content = render_template_string(setup_html, error=None, csrf_token=_get_csrf_token())
-        return render_template_string(base_html, content=content)
+        content = setup_tpl.render(error=None, csrf_token=_get_csrf_token())
+        return _wrap(content)
 
     @app.post("/setup")
     def setup_post():
-        nonlocal username, password_hash, password_salt, password_iters, needs_setup
+        nonlocal username, password_hash, password_salt, password_iters, password_kdf, needs_setup
         if not needs_setup:
             return redirect(url_for("home"))
         _require_csrf(request.form)
         user = request.form.get("username", "").strip()
         pw = request.form.get("password", "")
         if len(user) < 3 or len(pw) < 8:
-            content = render_template_string(setup_html, error="Username must be 3+ chars and password 8+ chars", csrf_token=_get_csrf_token())
-            return render_template_string(base_html, content=content)
-        save_credentials(user, pw, secret_key)
+            content = setup_tpl.render(error="Username must be 3+ chars and password 8+ chars", csrf_token=_get_csrf_token())
+            return _wrap(content)
+        # Keep the freshly saved hash in memory without re-reading the config file
+        password_salt, password_hash, password_iters = save_credentials(user, pw, secret_key)
+        password_kdf = DEFAULT_KDF
         username = user
-        # reload newly saved hashed credentials
-        cfg2, _ = load_config()
-        password_hash = cfg2.get("RQS_WEB_HASH", "")
-        password_salt = cfg2.get("RQS_WEB_SALT", "")
-        try:
-            password_iters = int(cfg2.get("RQS_PBKDF2_ITERATIONS", "200000") or "200000")
-        except Exception:
-            password_iters = 200000
         needs_setup = False
         session["auth"] = "ok"
         return redirect(url_for("home"))
@@ -637,8 +799,8 @@ def create_app(
             return redirect(url_for("setup_get"))
         if _is_logged_in():
             return redirect(url_for("home"))
-        content = render_template_string(login_html, error=None, csrf_token=_get_csrf_token())
-        return render_template_string(base_html, content=content)
+        content = login_tpl.render(error=None, csrf_token=_get_csrf_token())
+        return _wrap(content)
 
     @app.post("/login")
     def login_post():
@@ -666,27 +828,38 @@ def create_app(
             live_user = (cfg_live.get("RQS_WEB_USER", "") or "").strip()
             live_hash = cfg_live.get("RQS_WEB_HASH", "")
             live_salt = cfg_live.get("RQS_WEB_SALT", "")
+            live_kdf = cfg_live.get("RQS_KDF", "pbkdf2")
             try:
-                live_iters = int(cfg_live.get("RQS_PBKDF2_ITERATIONS", "200000") or "200000")
+                live_iters = int(cfg_live.get("RQS_PBKDF2_ITERATIONS") or default_cost(live_kdf))
                 if live_iters <= 0:
-                    live_iters = 200000
-            except Exception:
-                live_iters = 200000
-        except Exception:
+                    live_iters = default_cost(live_kdf)
+            except (TypeError, ValueError):
+                live_iters = default_cost(live_kdf)
+        except (OSError, ValueError, RuntimeError):
+            # RuntimeError: load_config's plaintext migration failed; use the startup credentials
             live_user = (username or "").strip()
             live_hash = password_hash
             live_salt = password_salt
             live_iters = password_iters
+            live_kdf = password_kdf
 
         # Allow login if the password matches the single stored credential.
         # Username is compared case-insensitively when present but does not block a correct password.
-        if verify_password(pw, live_salt, live_hash, live_iters):
+        if not live_hash or not live_salt:
+            verify_password(pw, dummy_salt, dummy_hash, dummy_cost, DEFAULT_KDF)
+        elif _check_password(pw, live_salt, live_hash, live_iters, live_kdf):
+            # Upgrade older hashes to the current KDF while the plaintext is at hand
+            # (skipped when the hash comes from the environment, which we cannot rewrite)
+            if needs_rehash(live_kdf) and not env.hash_from_env:
+                try:
+                    save_credentials(live_user, pw, secret_key)
+                except (OSError, ValueError):
+                    pass
             session["auth"] = "ok"
             return redirect(url_for("home"))
 
         # Fallback: if a plaintext password exists in the on-disk config, migrate it now and allow login
         try:
-            from .config import get_config_path, _read_json_file, _write_json_file, _hash_password  # type: ignore
             path = get_config_path()
             raw_cfg = _read_json_file(path)
             raw_pass = str(raw_cfg.get("RQS_WEB_PASS", "") or "")
@@ -700,40 +873,40 @@ def create_app(
                 new_cfg["RQS_WEB_SALT"] = salt_hex
                 new_cfg["RQS_WEB_HASH"] = hash_hex
                 new_cfg["RQS_PBKDF2_ITERATIONS"] = str(iters)
+                new_cfg["RQS_KDF"] = DEFAULT_KDF
                 _write_json_file(path, new_cfg)
                 # Validate with freshly migrated values
-                if verify_password(pw, salt_hex, hash_hex, iters):
+                if verify_password(pw, salt_hex, hash_hex, iters, DEFAULT_KDF):
                     session["auth"] = "ok"
                     return redirect(url_for("home"))
-        except Exception:
+        except (OSError, ValueError):
             pass
 
         # Fallback 2: if plaintext creds are provided via environment, accept once and migrate to hashed
         try:
-            env_pass = os.getenv("RQS_WEB_PASS")
-            env_user = os.getenv("RQS_WEB_USER")
-            if isinstance(env_pass, str) and env_pass and pw == env_pass:
-                from .config import get_config_path, _read_json_file, _write_json_file, _hash_password  # type: ignore
+            env_pass = env.web_pass
+            if env_pass and pw == env_pass:
                 path = get_config_path()
                 raw_cfg = _read_json_file(path)
                 salt_hex, hash_hex, iters = _hash_password(env_pass)
                 new_cfg = dict(raw_cfg)
                 new_cfg.pop("RQS_WEB_PASS", None)
-                if isinstance(env_user, str) and env_user.strip():
-                    new_cfg["RQS_WEB_USER"] = env_user.strip()
+                if env.web_user:
+                    new_cfg["RQS_WEB_USER"] = env.web_user
                 elif live_user:
                     new_cfg["RQS_WEB_USER"] = live_user
                 new_cfg["RQS_WEB_SALT"] = salt_hex
                 new_cfg["RQS_WEB_HASH"] = hash_hex
                 new_cfg["RQS_PBKDF2_ITERATIONS"] = str(iters)
+                new_cfg["RQS_KDF"] = DEFAULT_KDF
                 _write_json_file(path, new_cfg)
                 session["auth"] = "ok"
                 return redirect(url_for("home"))
-        except Exception:
+        except (OSError, ValueError):
             pass
         _record_attempt(client_ip)
-        content = render_template_string(login_html, error="Invalid credentials", csrf_token=_get_csrf_token())
-        return render_template_string(base_html, content=content)
+        content = login_tpl.render(error="Invalid credentials", csrf_token=_get_csrf_token())
+        return _wrap(content)
 
     @app.get("/logout")
     def logout():
@@ -742,19 +915,14 @@ def create_app(
 
     @app.get("/")
     def home():
-        if needs_setup:
-            return redirect(url_for("setup_get"))
-        if not _is_logged_in():
-            return redirect(url_for("login_get"))
-        content = render_template_string(
-            home_html,
+        content = home_tpl.render(
             style=default_step_style,
             adhd_mode=adhd_mode,
             message=request.args.get("m"),
             error=request.args.get("e"),
             csrf_token=_get_csrf_token(),
         )
-        return render_template_string(base_html, content=content)
+        return _wrap(content)
 
     def _parse_objectives(raw: str) -> List[str]:
         return [item.strip() for item in raw.split(',') if item.strip()]
@@ -762,7 +930,8 @@ def create_app(
     # Removed unused helpers (_expand_to_super_adhd, _generate_data_from_intent)
 
     # ---------------- In-memory print queue ----------------
-    job_queue: Queue = Queue()
+    # Printing is serial, so a bounded queue caps memory under a flood of submissions
+    job_queue: Queue = Queue(maxsize=env.queue_max)
 
     def _worker_loop() -> None:
         import logging
@@ -794,20 +963,17 @@ def create_app(
                 # Continue the loop to keep worker alive
                 continue
 
-    def _monitor_worker(worker_thread: threading.Thread) -> None:
-        """Monitor worker thread and restart if it dies"""
+    def _supervise_worker(worker_thread: threading.Thread) -> None:
+        """Restart the worker as soon as it exits (join() blocks without polling)"""
         import logging
         logger = logging.getLogger(__name__)
-        
+
         while True:
-            time.sleep(30)  # Check every 30 seconds
-            if not worker_thread.is_alive():
-                logger.error("Print worker thread died, restarting...")
-                print("WARNING: Print worker thread died, restarting...")
-                # Start a new worker thread
-                new_worker = threading.Thread(target=_worker_loop, name="rqs-print-worker", daemon=True)
-                new_worker.start()
-                worker_thread = new_worker
+            worker_thread.join()
+            logger.error("Print worker thread died, restarting...")
+            print("WARNING: Print worker thread died, restarting...")
+            worker_thread = threading.Thread(target=_worker_loop, name="rqs-print-worker", daemon=True)
+            worker_thread.start()
 
     def _process_job(job: Dict[str, Any]) -> None:
         # Resolve inputs
@@ -829,8 +995,7 @@ def create_app(
                     objectives = _parse_objectives(raw_steps)
                 else:
                     try:
-                        from .main import _generate_data_from_intent as gen
-                        data = gen(line_j, True)
+                        data = _generate_data_from_intent(line_j, True)
                         title_j = str(data.get("title", title_j or "Untitled Quest")) or "Untitled Quest"
                         description_j = str(data.get("description", description_j))
                         objectives = list(data.get("objectives", []) or [])
@@ -846,9 +1011,7 @@ def create_app(
             # Optional granular expansion
             if adhd_mode_j == "super":
                 try:
-                    from ..core.quest_generator import LocalLLMQuestGenerator
-                    generator = LocalLLMQuestGenerator()
-                    data_g = generator.generate_granular(title_j or description_j or "", objectives, fast=True)
+                    data_g = _get_llm().generate_granular(title_j or description_j or "", objectives, fast=True)
                     gen_objs = list(data_g.get("objectives", []) or [])
                     if gen_objs:
                         objectives = [str(o) for o in gen_objs]
@@ -877,9 +1040,7 @@ def create_app(
                     )
                 finally:
                     try:
-                        close_fn = getattr(printer, "close", None)
-                        if callable(close_fn):
-                            close_fn()
+                        printer.close()
                     except Exception:
                         pass
             except Exception:
@@ -891,8 +1052,7 @@ def create_app(
         text_md = ""
         if line_j:
             try:
-                from .main import _auto_markdown_from_text as auto_md
-                text_md = auto_md(line_j)
+                text_md = _auto_markdown_from_text(line_j)
             except Exception:
                 text_md = line_j
         elif title_j or steps_j or description_j:
@@ -916,9 +1076,7 @@ def create_app(
                 print_markdown_document(printer, text_md)
             finally:
                 try:
-                    close_fn = getattr(printer, "close", None)
-                    if callable(close_fn):
-                        close_fn()
+                    printer.close()
                 except Exception:
                     pass
         except Exception:
@@ -928,15 +1086,12 @@ def create_app(
     worker_thread = threading.Thread(target=_worker_loop, name="rqs-print-worker", daemon=True)
     worker_thread.start()
     
-    # Start monitor thread to restart worker if it dies
-    monitor_thread = threading.Thread(target=_monitor_worker, args=(worker_thread,), name="rqs-worker-monitor", daemon=True)
+    # Start supervisor thread to restart worker if it dies
+    monitor_thread = threading.Thread(target=_supervise_worker, args=(worker_thread,), name="rqs-worker-monitor", daemon=True)
     monitor_thread.start()
 
     @app.post("/submit")
     def submit():
-        if not _is_logged_in():
-            abort(401)
-
         _require_csrf(request.form)
         form = request.form
         line = (form.get("line") or "").strip()
@@ -950,54 +1105,47 @@ def create_app(
         if not any([line, title, steps, description]):
             return redirect(url_for('home', e="Please enter a task."))
 
-        # Enqueue job and redirect immediately
-        job_queue.put({
-            "line": line,
-            "title": title,
-            "steps": steps,
-            "description": description,
-            "style": style,
-            "adhd_mode": adhd_mode_sel,
-            "mode": mode_sel,
-        })
+        # Enqueue job and redirect immediately; reject rather than block when the queue is full
+        try:
+            job_queue.put_nowait({
+                "line": line,
+                "title": title,
+                "steps": steps,
+                "description": description,
+                "style": style,
+                "adhd_mode": adhd_mode_sel,
+                "mode": mode_sel,
+            })
+        except Full:
+            return redirect(url_for('home', e="The printer is busy. Please try again in a minute."))
         return redirect(url_for('printed'))
 
     @app.get("/printed")
     def printed():
-        if not _is_logged_in():
-            return redirect(url_for("login_get"))
-        content = render_template_string(printed_html)
-        return render_template_string(base_html, content=content)
+        # The page only varies by url_for('home'), i.e. by the mount point
+        body = printed_cache.get(request.script_root)
+        if body is None:
+            body = printed_cache[request.script_root] = _wrap(printed_tpl.render())
+        return body
 
     @app.after_request
     def add_headers(response):
         return _apply_secure_headers(response)
 
+    @app.get("/static/app.css")
+    def app_css():
+        # The URL carries the content hash, so the stylesheet can be cached indefinitely
+        resp = Response(APP_CSS_BYTES, mimetype="text/css")
+        resp.set_etag(APP_CSS_ETAG)
+        resp.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+        return resp.make_conditional(request)
+
     @app.get("/manifest.webmanifest")
     def manifest():
-        manifest_json = {
-            "name": "Receipt Quest - Task Printer",
-            "short_name": "Receipt Quest",
-            "description": "Transform any task into detailed, printable quest receipts",
-            "start_url": "/",
-            "display": "standalone",
-            "background_color": "#0f1628",
-            "theme_color": "#4f8cc9",
-            "orientation": "portrait",
-            "scope": "/",
-            "lang": "en",
-            "categories": ["productivity", "utilities"],
-            "icons": [
-                {
-                    "src": "data:image/svg+xml;base64,PHN2ZyB3aWR0aD0iMTkyIiBoZWlnaHQ9IjE5MiIgdmlld0JveD0iMCAwIDE5MiAxOTIiIGZpbGw9Im5vbmUiIHhtbG5zPSJodHRwOi8vd3d3LnczLm9yZy8yMDAwL3N2ZyI+CjxyZWN0IHdpZHRoPSIxOTIiIGhlaWdodD0iMTkyIiByeD0iNDAiIGZpbGw9IiMwZjE2MjgiLz4KPHJlY3QgeD0iMzIiIHk9IjMyIiB3aWR0aD0iMTI4IiBoZWlnaHQ9IjE2MCIgcng9IjE2IiBmaWxsPSIjNGY4Y2M5IiBmaWxsLW9wYWNpdHk9IjAuMiIvPgo8cGF0aCBkPSJNNjQgODBoMjRNNjQgOTZoNDBNNjQgMTEyaDMyTTY0IDEyOGgyNCIgc3Ryb2tlPSIjNGY4Y2M5IiBzdHJva2Utd2lkdGg9IjQiIHN0cm9rZS1saW5lY2FwPSJyb3VuZCIvPgo8Y2lyY2xlIGN4PSI5NiIgY3k9IjY0IiByPSIxNiIgZmlsbD0iIzRmOGNjOSIvPgo8L3N2Zz4K",
-                    "sizes": "192x192",
-                    "type": "image/svg+xml",
-                    "purpose": "any maskable"
-                }
-            ]
-        }
-        from flask import jsonify
-        return jsonify(manifest_json)
+        resp = Response(APP_MANIFEST_BYTES, mimetype="application/manifest+json")
+        resp.set_etag(APP_MANIFEST_ETAG)
+        resp.headers["Cache-Control"] = "public, max-age=86400"
+        return resp.make_conditional(request)
 
     return app
 
@@ -2,17 +2,21 @@ from __future__ import annotations
 
 from dataclasses import dataclass, field
 from typing import List, Optional, Dict, Any
+import sys
 import time
 import uuid
 
+# slots drop the per-instance __dict__; the dataclass flag only exists on Python 3.10+
+_DATACLASS_OPTS: Dict[str, Any] = {"slots": True} if sys.version_info >= (3, 10) else {}
 
-@dataclass
+
+@dataclass(**_DATACLASS_OPTS)
 class Objective:
     text: str
     estimate_mins: Optional[int] = None
 
 
-@dataclass
+@dataclass(**_DATACLASS_OPTS)
 class Quest:
     id: str
     created_ts: float
@@ -1,10 +1,388 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, FrozenSet, Tuple
+import functools
+import http.client
 import json
 import urllib.request
 import urllib.error
 import time
 from typing import Optional
 import os
+import re
+import hashlib
+import sqlite3
+import threading
+from collections import OrderedDict
+from urllib.parse import urlsplit
+from concurrent.futures import Future, ThreadPoolExecutor
+
+try:
+    import orjson  # type: ignore
+except ImportError:
+    orjson = None  # type: ignore
+
+
+def _json_loads(raw):
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def _json_dumps(data: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data).encode("utf-8")
+
+
+# Exact-match response cache keyed on (model, prompt, options). It lives at module level so
+# every generator instance shares it, including ad-hoc ones outside the shared _get_llm().
+_RESPONSE_CACHE: "OrderedDict[str, str]" = OrderedDict()
+_RESPONSE_CACHE_MAX = 1024
+_RESPONSE_CACHE_LOCK = threading.Lock()
+# Cache keys whose request is in flight; later callers wait on the same Future
+_INFLIGHT: Dict[str, Future] = {}
+# Sampling at or below this temperature is near-deterministic, so a stored answer is as good
+# as a fresh one
+_CACHEABLE_MAX_TEMPERATURE = 0.2
+
+# Opt-in on-disk tier shared across runs (RQS_LLM_CACHE=1). RQS_LLM_CACHE and XDG_CACHE_HOME
+# are read on first use, after run() has loaded any .env files.
+_response_db: Optional[sqlite3.Connection] = None
+_response_db_failed = False
+
+
+def _response_db_conn() -> Optional[sqlite3.Connection]:
+    # Caller holds _RESPONSE_CACHE_LOCK; the connection is shared across threads under it
+    global _response_db, _response_db_failed
+    if _response_db is None and not _response_db_failed:
+        if os.getenv("RQS_LLM_CACHE", "").strip().lower() not in {"1", "true", "yes", "on"}:
+            _response_db_failed = True
+            return None
+        db_path = os.path.join(
+            os.getenv("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"),
+            "receiptquest",
+            "llm_cache.sqlite",
+        )
+        try:
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+            conn = sqlite3.connect(db_path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, response TEXT NOT NULL, ts INTEGER)"
+            )
+            _response_db = conn
+        except (OSError, sqlite3.Error):
+            _response_db_failed = True
+    return _response_db
+
+
+def _cached_response(key: str) -> Optional[str]:
+    with _RESPONSE_CACHE_LOCK:
+        hit = _RESPONSE_CACHE.get(key)
+        if hit is not None:
+            _RESPONSE_CACHE.move_to_end(key)
+            return hit
+        conn = _response_db_conn()
+        if conn is None:
+            return None
+        try:
+            row = conn.execute("SELECT response FROM responses WHERE key = ?", (key,)).fetchone()
+        except sqlite3.Error:
+            return None
+        if row is None:
+            return None
+        _RESPONSE_CACHE[key] = row[0]
+        if len(_RESPONSE_CACHE) > _RESPONSE_CACHE_MAX:
+            _RESPONSE_CACHE.popitem(last=False)
+        return row[0]
+
+
+def _store_response(key: str, response: str) -> None:
+    with _RESPONSE_CACHE_LOCK:
+        _RESPONSE_CACHE[key] = response
+        if len(_RESPONSE_CACHE) > _RESPONSE_CACHE_MAX:
+            _RESPONSE_CACHE.popitem(last=False)
+        conn = _response_db_conn()
+        if conn is not None:
+            try:
+                with conn:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO responses (key, response, ts) VALUES (?, ?, ?)",
+                        (key, response, int(time.time())),
+                    )
+            except sqlite3.Error:
+                pass
+
+
+# Lightweight categorization to reduce misclassification (e.g., tidy desk ≠ study).
+# Categories in priority order; keywords match as substrings ("cleaning" hits "clean"), one
+# compiled alternation per category instead of a Python-level `in` loop over each keyword.
+_CATEGORY_KEYWORDS: Tuple[Tuple[str, Tuple[str, ...]], ...] = (
+    ("cleaning", ("tidy", "declutter", "organize", "clean", "wipe", "dust")),
+    ("beverage", ("coffee", "tea", "brew", "drink", "beverage")),
+    ("study", ("study", "homework", "assignment", "write", "essay", "notes", "reading")),
+    ("dishes", ("dishes", "sink", "dishwasher", "plates", "cups")),
+    ("laundry", ("laundry", "washer", "dryer", "clothes", "fold")),
+    ("cooking", ("cook", "cooking", "meal", "breakfast", "lunch", "dinner", "prep")),
+    ("hygiene", ("shower", "bathe", "bath", "wash hair")),
+    ("admin", ("email", "inbox", "admin", "forms", "bills", "tax", "bank")),
+    ("workout", ("workout", "exercise", "gym", "walk", "run", "stretch", "pushup", "yoga")),
+    ("errand", ("grocery", "shopping", "store", "errand", "pharmacy")),
+)
+_CATEGORY_PATTERNS: Tuple[Tuple[str, "re.Pattern[str]"], ...] = tuple(
+    (category, re.compile("|".join(map(re.escape, words)))) for category, words in _CATEGORY_KEYWORDS
+)
+# First listed surface wins (not the leftmost one in the text)
+_CLEANING_SURFACES = ("desk", "table", "counter", "room", "kitchen", "bathroom")
+
+
+def _infer_category(text: str) -> Dict[str, Any]:
+    t = (text or "").lower()
+    for category, pattern in _CATEGORY_PATTERNS:
+        if pattern.search(t):
+            info: Dict[str, Any] = {"category": category}
+            if category == "cleaning":
+                for surf in _CLEANING_SURFACES:
+                    if surf in t:
+                        info["surface"] = surf
+                        break
+            return info
+    return {"category": "generic"}
+
+
+# Opt-in fuzzy cache for generate_granular (RQS_SEMANTIC_CACHE=1): near-identical rewordings of
+# an intent ("clean my desk" / "clean the desk") reuse an earlier checklist
+_SEMANTIC_CACHE: "OrderedDict[Tuple[Any, FrozenSet[str]], Dict[str, object]]" = OrderedDict()
+_SEMANTIC_CACHE_MAX = 500
+_SEMANTIC_THRESHOLD = 0.85
+_SEMANTIC_LOCK = threading.Lock()
+_INTENT_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_INTENT_STOPWORDS = frozenset(
+    {"a", "an", "the", "my", "to", "of", "for", "and", "some", "please", "i", "need", "want", "go",
+     "do", "get"}
+)
+
+
+def _semantic_key(
+    model: str,
+    intent: str,
+    existing: Optional[List[str]],
+    fast: Optional[bool],
+    category_override: Optional[str],
+    subject: Optional[str],
+) -> Optional[Tuple[Any, FrozenSet[str]]]:
+    """Return (context, token set) for intent, or None when the semantic cache is off."""
+    if os.getenv("RQS_SEMANTIC_CACHE", "").strip().lower() not in {"1", "true", "yes", "on"}:
+        return None
+    words = _INTENT_TOKEN_RE.findall((intent or "").lower())
+    tokens = frozenset(w for w in words if w not in _INTENT_STOPWORDS)
+    if not tokens:
+        return None
+    category = (category_override or "").strip().lower()
+    if not category:
+        category = _infer_category(intent).get("category", "generic")
+    # Everything besides the wording must match exactly
+    context = (model, category, tuple(existing or ()), bool(fast), (subject or "").strip().lower())
+    return context, tokens
+
+
+def _semantic_lookup(key: Tuple[Any, FrozenSet[str]]) -> Optional[Dict[str, object]]:
+    context, tokens = key
+    with _SEMANTIC_LOCK:
+        hit = _SEMANTIC_CACHE.get(key)
+        if hit is None:
+            for (other_context, other_tokens), result in reversed(_SEMANTIC_CACHE.items()):
+                if other_context == context and (
+                    len(tokens & other_tokens) / len(tokens | other_tokens) >= _SEMANTIC_THRESHOLD
+                ):
+                    hit = result
+                    break
+    if hit is None:
+        return None
+    return {**hit, "objectives": list(hit.get("objectives", []) or [])}
+
+
+def _semantic_store(key: Tuple[Any, FrozenSet[str]], result: Dict[str, object]) -> None:
+    # Only keep real model output; the empty fallback shell must not be replayed
+    if not result.get("objectives"):
+        return
+    with _SEMANTIC_LOCK:
+        _SEMANTIC_CACHE[key] = {**result, "objectives": list(result.get("objectives", []) or [])}
+        _SEMANTIC_CACHE.move_to_end(key)
+        if len(_SEMANTIC_CACHE) > _SEMANTIC_CACHE_MAX:
+            _SEMANTIC_CACHE.popitem(last=False)
+
+
+# Static scaffolding for the granular prompt. Only the category/subject, user steps and the
+# task line vary per call, so everything else is built once at import time.
+_GRANULAR_PROMPT_HEADER = (
+    "You produce a VERY granular, activation-friendly checklist for the user's real-life task.\n"
+    "Identify the task category from the user's words (e.g., making coffee, washing dishes, doing laundry, cooking, studying, cleaning, showering, errands).\n"
+    "Produce domain-appropriate steps for that task.\n"
+    "Do NOT invent brand/model-specific details or people.\n"
+    "Do NOT guess hidden specifics (no fake recipes, names, tools not mentioned).\n"
+    "Avoid all times/durations (no minutes/seconds/timers).\n"
+    "The FIRST step must be a tiny micro-activation that reduces friction.\n"
+    "Use short imperative sentences (<= 60 chars).\n"
+    "For beverages/liquids, end with 'Enjoy a sip' (never 'bite').\n"
+)
+_GRANULAR_PROMPT_FOOTER = (
+    "Output STRICT JSON ONLY. No extra text, no markdown.\n"
+    "Schema: {\n  \"title\": string,\n  \"description\": string,\n  \"objectives\": array of 6-15 short strings,\n  \"rewards\": string\n}\n"
+)
+_RULES_BY_CATEGORY: Dict[str, str] = {
+    "cleaning": (
+        "Avoid study/homework actions (no reading or writing).\n"
+        "Use a cleaning flow: declutter, group, wipe, reset.\n"
+        "Do not include any study terms: writing utensil, notebook, paper, page, skim, read, summary, problem.\n"
+    ),
+    "study": (
+        "Avoid cleaning actions (no wiping or washing).\n"
+        "Use a study flow: open task, first problem, next chunk, save.\n"
+    ),
+    "beverage": (
+        "End with 'Enjoy a sip'.\n"
+        "Use machine/pod-friendly steps unless a method is stated.\n"
+    ),
+}
+_STUDY_SUBJECT_RULES: Dict[str, str] = {
+    "math": "Use math wording: problem, check answer, next 1–2 problems.\n",
+    "english": "Use writing wording: draft a sentence, next small section, quick read.\n",
+}
+_CUSTOM_INSTRUCTIONS_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    "ai_instructions.md",
+)
+
+
+@functools.lru_cache(maxsize=1)
+def _custom_instructions() -> str:
+    """Return the repo's ai_instructions.md, read once per process ('' when absent)."""
+    try:
+        with open(_CUSTOM_INSTRUCTIONS_PATH, "r", encoding="utf-8") as f:
+            return f.read()
+    except OSError:
+        return ""
+
+
+_JSON_DECODER = json.JSONDecoder()
+
+
+def _extract_json_object(s: str) -> Optional[Dict[str, Any]]:
+    """Return the first JSON object embedded in model output, or None."""
+    # Try direct parse first
+    try:
+        return _json_loads(s)
+    except Exception:
+        pass
+    # raw_decode from each candidate '{'; on failure resume at the error offset so the scan
+    # stays linear no matter how many braces the output contains
+    skipped: List[Tuple[int, int]] = []
+    start = s.find("{")
+    while start != -1:
+        try:
+            obj, _ = _JSON_DECODER.raw_decode(s, start)
+            return obj
+        except json.JSONDecodeError as e:
+            resume = max(e.pos, start + 1)
+            skipped.append((start, resume))
+            start = s.find("{", resume)
+    # A valid object can sit inside a malformed outer one (unclosed brace, bad trailing
+    # value); rescan the skipped spans once for nested candidates
+    for lo, hi in skipped:
+        start = s.find("{", lo + 1, hi)
+        while start != -1:
+            try:
+                obj, _ = _JSON_DECODER.raw_decode(s, start)
+                return obj
+            except json.JSONDecodeError:
+                start = s.find("{", start + 1, hi)
+    return None
+
+
+# Keep-alive connections to the Ollama server, one per (thread, base URL). http.client
+# connections are not thread-safe, so each worker/batch thread keeps its own socket.
+_HTTP_LOCAL = threading.local()
+_HTTP_RETRYABLE = (http.client.CannotSendRequest, http.client.BadStatusLine, ConnectionError)
+
+# (base_url, model) -> monotonic deadline until which a successful readiness check is trusted.
+# Shared across instances so back-to-back jobs skip the /api/tags round trips.
+_READY_UNTIL: Dict[Tuple[str, str], float] = {}
+_READY_TTL_S = 30.0
+
+
+def _http_request(
+    base_url: str, method: str, path: str, body: Optional[bytes], headers: Dict[str, str], timeout: float
+) -> bytes:
+    """Send one request over this thread's persistent connection and return the body."""
+    conns = getattr(_HTTP_LOCAL, "conns", None)
+    if conns is None:
+        conns = _HTTP_LOCAL.conns = {}
+    for attempt in (0, 1):
+        conn = conns.get(base_url)
+        reused = conn is not None
+        if conn is None:
+            parts = urlsplit(base_url)
+            cls = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+            conn = conns[base_url] = cls(parts.hostname or "127.0.0.1", parts.port, timeout=timeout)
+        conn.timeout = timeout
+        try:
+            if conn.sock is not None:
+                conn.sock.settimeout(timeout)
+            conn.request(method, urlsplit(base_url).path + path, body=body, headers=headers)
+            resp = conn.getresponse()
+            data = resp.read()
+        except _HTTP_RETRYABLE:
+            conn.close()
+            conns.pop(base_url, None)
+            # A pooled socket the server already closed; retry once on a fresh one
+            if reused and attempt == 0:
+                continue
+            raise
+        except Exception:
+            conn.close()
+            conns.pop(base_url, None)
+            raise
+        if resp.will_close:
+            conn.close()
+            conns.pop(base_url, None)
+        if resp.status >= 400:
+            raise urllib.error.HTTPError(base_url + path, resp.status, resp.reason, resp.headers, None)
+        return data
+    raise RuntimeError("unreachable")
+
+
+class _JsonObjectScanner:
+    """Track brace depth over streamed text to spot where the first top-level object closes."""
+
+    __slots__ = ("depth", "in_string", "escaped", "consumed")
+
+    def __init__(self) -> None:
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+        self.consumed = 0
+
+    def feed(self, chunk: str) -> int:
+        """Return the offset just past the closing brace, or -1 if the object is still open."""
+        for i, ch in enumerate(chunk):
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif ch == "\\":
+                    self.escaped = True
+                elif ch == '"':
+                    self.in_string = False
+            elif ch == '"':
+                if self.depth:
+                    self.in_string = True
+            elif ch == "{":
+                self.depth += 1
+            elif ch == "}" and self.depth:
+                self.depth -= 1
+                if not self.depth:
+                    return self.consumed + i + 1
+        self.consumed += len(chunk)
+        return -1
 
 
 class LocalLLMQuestGenerator:
@@ -24,21 +402,17 @@ class LocalLLMQuestGenerator:
 
     # -------- HTTP helpers --------
     def _get_json(self, path: str, timeout: float = 5.0) -> Dict[str, Any]:
-        url = f"{self.base_url}{path}"
-        req = urllib.request.Request(url, headers={"Accept": "application/json"})
-        with urllib.request.urlopen(req, timeout=timeout) as resp:
-            return json.loads(resp.read().decode("utf-8"))
+        raw = _http_request(self.base_url, "GET", path, None, {"Accept": "application/json"}, timeout)
+        return _json_loads(raw)
 
     def _post_json(self, path: str, payload: Dict[str, Any], timeout: float = 30.0) -> Dict[str, Any]:
-        url = f"{self.base_url}{path}"
-        data = json.dumps(payload).encode("utf-8")
-        req = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"})
-        with urllib.request.urlopen(req, timeout=timeout) as resp:
-            return json.loads(resp.read().decode("utf-8"))
+        data = _json_dumps(payload)
+        raw = _http_request(self.base_url, "POST", path, data, {"Content-Type": "application/json"}, timeout)
+        return _json_loads(raw)
 
     def _post_stream(self, path: str, payload: Dict[str, Any], timeout: float = 600.0):
         url = f"{self.base_url}{path}"
-        data = json.dumps(payload).encode("utf-8")
+        data = _json_dumps(payload)
         req = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"})
         return urllib.request.urlopen(req, timeout=timeout)
 
@@ -72,7 +446,7 @@ class LocalLLMQuestGenerator:
                         line = raw_line.decode("utf-8").strip()
                         if not line:
                             continue
-                        j = json.loads(line)
+                        j = _json_loads(line)
                         status = j.get("status") or j.get("error")
                         if progress and status:
                             print(f"- {status}")
@@ -89,6 +463,9 @@ class LocalLLMQuestGenerator:
             raise RuntimeError(f"Model pull failed: {e}")
 
     def ensure_model_ready(self) -> None:
+        ready_key = (self.base_url, self.model)
+        if _READY_UNTIL.get(ready_key, 0.0) > time.monotonic():
+            return
         if not self.is_server_running():
             raise RuntimeError("Ollama server is not running at 127.0.0.1:11434. Start it with 'ollama serve'.")
         if not self.model_is_available():
@@ -101,6 +478,7 @@ class LocalLLMQuestGenerator:
                 time.sleep(1.0)
             if not self.model_is_available():
                 raise RuntimeError(f"Model '{self.model}' is not available after pull.")
+        _READY_UNTIL[ready_key] = time.monotonic() + _READY_TTL_S
 
     # -------- Generation --------
     # Define constant for consistent top_p across all generation modes
@@ -119,15 +497,72 @@ class LocalLLMQuestGenerator:
         payload = {
             "model": self.model,
             "prompt": prompt,
-            "stream": False,
+            "stream": True,
             "options": request_options,
         }
-        data = json.dumps(payload).encode("utf-8")
-        url = f"{self.base_url}/api/generate"
-        req = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"})
-        with urllib.request.urlopen(req, timeout=timeout_s) as resp:
-            body = json.loads(resp.read().decode("utf-8"))
-        return body.get("response", "").strip()
+        # generate() and generate_granular() both end here, so they share one cache keyed on
+        # the final prompt
+        try:
+            cacheable = float(request_options.get("temperature", 1.0)) <= _CACHEABLE_MAX_TEMPERATURE
+        except (TypeError, ValueError):
+            cacheable = False
+        if not cacheable:
+            return self._post_generate(payload, timeout_s)
+        key_source = json.dumps({"m": self.model, "p": prompt, "o": request_options}, sort_keys=True)
+        cache_key = hashlib.sha256(key_source.encode("utf-8")).hexdigest()
+        hit = _cached_response(cache_key)
+        if hit is not None:
+            return hit
+        # Identical prompts already on their way to the server share that one request
+        with _RESPONSE_CACHE_LOCK:
+            pending = _INFLIGHT.get(cache_key)
+            owner = pending is None
+            if owner:
+                pending = _INFLIGHT[cache_key] = Future()
+        if not owner:
+            return pending.result()
+        try:
+            text = self._post_generate(payload, timeout_s)
+            if text:
+                _store_response(cache_key, text)
+            pending.set_result(text)
+            return text
+        except BaseException as exc:
+            pending.set_exception(exc)
+            raise
+        finally:
+            with _RESPONSE_CACHE_LOCK:
+                _INFLIGHT.pop(cache_key, None)
+
+    def _post_generate(self, payload: Dict[str, Any], timeout_s: int) -> str:
+        # Stream tokens and stop once the output holds a complete JSON object. Small models often
+        # keep talking after the object; closing the connection cancels that generation.
+        parts: List[str] = []
+        scanner = _JsonObjectScanner()
+        with self._post_stream("/api/generate", payload, timeout=timeout_s) as resp:
+            for raw_line in resp:
+                if not raw_line.strip():
+                    continue
+                j = _json_loads(raw_line)
+                if j.get("error"):
+                    raise RuntimeError(f"Ollama error: {j['error']}")
+                chunk = j.get("response") or ""
+                while chunk:
+                    end = scanner.feed(chunk)
+                    if end < 0:
+                        parts.append(chunk)
+                        break
+                    cut = end - scanner.consumed
+                    parts.append(chunk[:cut])
+                    text = "".join(parts)
+                    if isinstance(_extract_json_object(text), dict):
+                        return text.strip()
+                    # Balanced braces in a prose preamble ("{ok}"); keep reading for the real object
+                    scanner = _JsonObjectScanner()
+                    chunk = chunk[cut:]
+                if j.get("done"):
+                    break
+        return "".join(parts).strip()
 
     def _build_prompt(self, intent: str) -> str:
         return (
@@ -180,46 +615,6 @@ class LocalLLMQuestGenerator:
         custom_instructions = self._load_custom_instructions()
         custom_block = (custom_instructions.strip() + "\n") if custom_instructions else ""
 
-        # Lightweight categorization to reduce misclassification (e.g., tidy desk ≠ study)
-        def _infer_category(text: str) -> Dict[str, Any]:
-            t = (text or "").lower()
-            info: Dict[str, Any] = {"category": "generic"}
-            if any(k in t for k in ["tidy", "declutter", "organize", "clean", "wipe", "dust"]):
-                info["category"] = "cleaning"
-                for surf in ["desk", "table", "counter", "room", "kitchen", "bathroom"]:
-                    if surf in t:
-                        info["surface"] = surf
-                        break
-                return info
-            if any(k in t for k in ["coffee", "tea", "brew", "drink", "beverage"]):
-                info["category"] = "beverage"
-                return info
-            if any(k in t for k in ["study", "homework", "assignment", "write", "essay", "notes", "reading"]):
-                info["category"] = "study"
-                return info
-            if any(k in t for k in ["dishes", "sink", "dishwasher", "plates", "cups"]):
-                info["category"] = "dishes"
-                return info
-            if any(k in t for k in ["laundry", "washer", "dryer", "clothes", "fold"]):
-                info["category"] = "laundry"
-                return info
-            if any(k in t for k in ["cook", "cooking", "meal", "breakfast", "lunch", "dinner", "prep"]):
-                info["category"] = "cooking"
-                return info
-            if any(k in t for k in ["shower", "bathe", "bath", "wash hair"]):
-                info["category"] = "hygiene"
-                return info
-            if any(k in t for k in ["email", "inbox", "admin", "forms", "bills", "tax", "bank"]):
-                info["category"] = "admin"
-                return info
-            if any(k in t for k in ["workout", "exercise", "gym", "walk", "run", "stretch", "pushup", "yoga"]):
-                info["category"] = "workout"
-                return info
-            if any(k in t for k in ["grocery", "shopping", "store", "errand", "pharmacy"]):
-                info["category"] = "errand"
-                return info
-            return info
-
         if isinstance(category_override, str) and category_override.strip():
             category = category_override.strip().lower()
             surface = ""
@@ -230,54 +625,25 @@ class LocalLLMQuestGenerator:
         category_block = f"Category: {category}\n" + (f"Surface: {surface}\n" if surface else "")
 
         # Category-specific rules
-        rules: List[str] = []
-        if category == "cleaning":
-            rules += [
-                "Avoid study/homework actions (no reading or writing).",
-                "Use a cleaning flow: declutter, group, wipe, reset.",
-            ]
-        if category == "study":
-            rules += [
-                "Avoid cleaning actions (no wiping or washing).",
-                "Use a study flow: open task, first problem, next chunk, save.",
-            ]
-            if isinstance(subject, str):
-                subj = subject.strip().lower()
-                if subj == "math":
-                    rules.append("Use math wording: problem, check answer, next 1–2 problems.")
-                if subj == "english":
-                    rules.append("Use writing wording: draft a sentence, next small section, quick read.")
-        if category == "beverage":
-            rules += [
-                "End with 'Enjoy a sip'.",
-                "Use machine/pod-friendly steps unless a method is stated.",
-            ]
-        if category == "cleaning":
-            rules.append(
-                "Do not include any study terms: writing utensil, notebook, paper, page, skim, read, summary, problem."
+        rules_block = _RULES_BY_CATEGORY.get(category, "")
+        if category == "study" and isinstance(subject, str):
+            rules_block += _STUDY_SUBJECT_RULES.get(subject.strip().lower(), "")
+
+        return "".join(
+            (
+                custom_block,
+                _GRANULAR_PROMPT_HEADER,
+                category_block,
+                rules_block,
+                existing_block,
+                _GRANULAR_PROMPT_FOOTER,
+                f"Task: {intent}\n",
+                "Respond with JSON only.",
             )
-        rules_block = ("\n".join(rules) + "\n") if rules else ""
-
-        prompt_text = (
-            custom_block
-            + "You produce a VERY granular, activation-friendly checklist for the user's real-life task.\n"
-            + "Identify the task category from the user's words (e.g., making coffee, washing dishes, doing laundry, cooking, studying, cleaning, showering, errands).\n"
-            + "Produce domain-appropriate steps for that task.\n"
-            + "Do NOT invent brand/model-specific details or people.\n"
-            + "Do NOT guess hidden specifics (no fake recipes, names, tools not mentioned).\n"
-            + "Avoid all times/durations (no minutes/seconds/timers).\n"
-            + "The FIRST step must be a tiny micro-activation that reduces friction.\n"
-            + "Use short imperative sentences (<= 60 chars).\n"
-            + "For beverages/liquids, end with 'Enjoy a sip' (never 'bite').\n"
-            + category_block
-            + rules_block
-            + existing_block
-            + "Output STRICT JSON ONLY. No extra text, no markdown.\n"
-            + "Schema: {\n  \"title\": string,\n  \"description\": string,\n  \"objectives\": array of 6-15 short strings,\n  \"rewards\": string\n}\n"
-            + f"Task: {intent}\n"
-            + "Respond with JSON only."
         )
-        return prompt_text
+
+    def _load_custom_instructions(self) -> str:
+        return _custom_instructions()
 
     def generate(self, intent: str, fast: Optional[bool] = None) -> Dict[str, object]:
         # Ensure server and model are available
@@ -297,29 +663,6 @@ class LocalLLMQuestGenerator:
             prompt = self._build_prompt(intent)
             text = self._request(prompt, options={"temperature": 0.1 if is_fast else 0.2, "top_p": self.DEFAULT_TOP_P, "num_predict": 220 if is_fast else 350}, timeout_s=30 if is_fast else 60)
         # Best effort to parse JSON; if it fails, fallback to simple structure
-        def _extract_json_object(s: str) -> Optional[Dict[str, Any]]:
-            # Try direct parse first
-            try:
-                return json.loads(s)
-            except Exception:
-                pass
-            # Scan for JSON object candidates and use raw_decode to avoid brace-counting inside strings
-            decoder = json.JSONDecoder()
-            i = 0
-            length = len(s)
-            while i < length:
-                start = s.find('{', i)
-                if start == -1:
-                    break
-                try:
-                    obj, end = decoder.raw_decode(s, start)
-                    if isinstance(obj, dict):
-                        return obj
-                except json.JSONDecodeError:
-                    # Not a valid object at this position; continue searching
-                    pass
-                i = start + 1
-            return None
 
         try:
             data_obj = _extract_json_object(text) or {}
@@ -357,7 +700,64 @@ class LocalLLMQuestGenerator:
         category_override: Optional[str] = None,
         subject: Optional[str] = None,
     ) -> Dict[str, object]:
+        # A semantic-cache hit also skips the server readiness round trip
+        key = _semantic_key(
+            self.model, intent, existing_objectives, fast, category_override, subject
+        )
+        if key is not None:
+            hit = _semantic_lookup(key)
+            if hit is not None:
+                return hit
         self.ensure_model_ready()
+        result = self._generate_granular(
+            intent, existing_objectives, fast, category_override, subject
+        )
+        if key is not None:
+            _semantic_store(key, result)
+        return result
+
+    def generate_granular_batch(
+        self,
+        intents: List[str],
+        fast: Optional[bool] = None,
+        per_part_overrides: Optional[List[Tuple[Optional[str], Optional[str]]]] = None,
+    ) -> List[Dict[str, object]]:
+        """Run generate_granular for several intents with one readiness check.
+
+        Ollama's /api/generate takes a single prompt, so each part is its own request;
+        with several parts they run on a small thread pool (the HTTP wait releases the
+        GIL) and results keep input order. per_part_overrides holds
+        (category_override, subject).
+        """
+        self.ensure_model_ready()
+        overrides = list(per_part_overrides or [])
+        overrides += [(None, None)] * (len(intents) - len(overrides))
+
+        def _one(idx: int) -> Dict[str, object]:
+            category_override, subject = overrides[idx]
+            key = _semantic_key(self.model, intents[idx], None, fast, category_override, subject)
+            if key is not None:
+                hit = _semantic_lookup(key)
+                if hit is not None:
+                    return hit
+            result = self._generate_granular(intents[idx], None, fast, category_override, subject)
+            if key is not None:
+                _semantic_store(key, result)
+            return result
+
+        if len(intents) <= 1:
+            return [_one(idx) for idx in range(len(intents))]
+        with ThreadPoolExecutor(max_workers=min(len(intents), 4)) as pool:
+            return list(pool.map(_one, range(len(intents))))
+
+    def _generate_granular(
+        self,
+        intent: str,
+        existing_objectives: Optional[List[str]],
+        fast: Optional[bool],
+        category_override: Optional[str],
+        subject: Optional[str],
+    ) -> Dict[str, object]:
         is_fast = self._is_fast(fast)
         prompt = self._build_granular_prompt(
             intent,
@@ -369,28 +769,6 @@ class LocalLLMQuestGenerator:
         opts = {"temperature": 0.1, "top_p": self.DEFAULT_TOP_P, "num_predict": 350 if is_fast else 700}
         text = self._request(prompt, options=opts, timeout_s=30 if is_fast else 60)
         # Parse like in generate()
-        def _extract_json_object(s: str) -> Optional[Dict[str, Any]]:
-            # Try direct parse first
-            try:
-                return json.loads(s)
-            except Exception:
-                pass
-            # Use raw_decode scanning from each '{'
-            decoder = json.JSONDecoder()
-            i = 0
-            length = len(s)
-            while i < length:
-                start = s.find('{', i)
-                if start == -1:
-                    break
-                try:
-                    obj, end = decoder.raw_decode(s, start)
-                    if isinstance(obj, dict):
-                        return obj
-                except json.JSONDecodeError:
-                    pass
-                i = start + 1
-            return None
         try:
             data_obj = _extract_json_object(text) or {}
             if not data_obj:
@@ -4,6 +4,7 @@ from .printer_utils import (
     select_printer_target,
     select_printer_target_noninteractive,
     open_printer_from_target,
+    Printer,
     try_beep,
     get_printer_columns
 )
@@ -14,6 +15,7 @@ __all__ = [
     "select_printer_target",
     "select_printer_target_noninteractive",
     "open_printer_from_target", 
+    "Printer",
     "try_beep",
     "get_printer_columns",
     "print_supportive_quest",
@@ -1,4 +1,4 @@
-from typing import List, Optional, Tuple, Any
+from typing import List, Optional, Tuple, Any, Protocol
 import textwrap
 import os
 import pathlib
@@ -399,7 +399,14 @@ def _open_usb_printer_with_fallbacks(vid: int, pid: int) -> Any:
     raise SystemExit(f"{hint}\nLast errors: {detail}")
 
 
-def open_printer_from_target(target: Tuple[str, Any]) -> Any:
+class Printer(Protocol):
+    """Minimal printer interface callers rely on; python-escpos printers satisfy it."""
+
+    def close(self) -> None:
+        ...
+
+
+def open_printer_from_target(target: Tuple[str, Any]) -> Printer:
     kind, data = target
     if kind == 'win32':
         if Win32Raw is None: